@@ -4,3 +4,12 @@ from django.apps import AppConfig
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        import utils.permission  # connect cache invalidation signals
+        import utils.search  # connect search index signals
+        import utils.revision  # connect revision signals
+        import utils.events  # connect event stream signals
+
+        from utils.mails import preload_templates
+        preload_templates()
@@ -0,0 +1,49 @@
+import hashlib
+from functools import wraps
+from typing import Any, Callable, Optional, Sequence
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags, quote_etag
+from rest_framework.response import Response
+from rest_framework import status
+
+
+def _make_etag(func, version: Sequence[Any]) -> str:
+    digest = hashlib.md5(repr((func.__module__, func.__qualname__, *version)).encode()).hexdigest()
+    return f"W/{quote_etag(digest)}"
+
+
+def etag_condition(version: Callable[..., Optional[Sequence[Any]]]):
+    """
+    Conditional responses for read endpoints. A GET or HEAD request whose `If-None-Match` holds
+    the current ETag is answered with 304 Not Modified, before the view runs any serialization.
+    Other methods run the view unconditionally, without an ETag.
+
+    Place it below the permission decorators, so that only permitted requests are answered.
+    For APIView methods, wrap it in `django.utils.decorators.method_decorator`.
+
+    :param version: Called with the arguments of the view, returns cheap values that change
+        whenever the response does (e.g. `updated_at` and a revision counter, the requested page),
+        or None to skip the condition.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return func(request, *args, **kwargs)
+            values = version(request, *args, **kwargs)
+            if values is None:
+                return func(request, *args, **kwargs)
+
+            etag = _make_etag(func, values)
+            if etag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', '')):
+                response = Response(status=status.HTTP_304_NOT_MODIFIED)
+            else:
+                response = func(request, *args, **kwargs)
+                if response.status_code != status.HTTP_200_OK:
+                    return response
+            response['ETag'] = etag
+            response['Cache-Control'] = 'private, no-cache'  # revalidate before reusing
+            patch_vary_headers(response, ['Cookie'])
+            return response
+        return wrapper
+    return decorator
@@ -1,7 +1,31 @@
 from functools import wraps
+from typing import List, Optional
 from rest_framework.response import Response
 from rest_framework import status
-from db.models.organization import Organization, Membership
+from db.models.organization import Organization
+from utils.permission import get_membership
+
+
+def check_organization_permission(request, id, required_roles: Optional[List[str]]) -> Optional[Response]:
+    """
+    Check the authenticated user's role in an organization, and attach
+    `request.organization` and `request.membership` on success.
+
+    :return: None if permitted, otherwise a 403 or 404 response.
+    """
+    membership = get_membership(request, id)
+    if membership is None:
+        if not Organization.objects.filter(id=id).exists():
+            return Response({"detail": "Organization not found."}, status=status.HTTP_404_NOT_FOUND)
+        return Response({"detail": "You do not have the required permissions."}, status=status.HTTP_403_FORBIDDEN)
+
+    if required_roles and membership.role not in required_roles:
+        return Response({"detail": "You do not have the required permissions."}, status=status.HTTP_403_FORBIDDEN)
+
+    request.organization = membership.organization
+    request.membership = membership
+    return None
+
 
 def organization_permission_classes(required_roles=None):
     if required_roles is None:
@@ -10,21 +34,9 @@ def organization_permission_classes(required_roles=None):
     def decorator(func):
         @wraps(func)
         def wrapper(request, *args, **kwargs):
-            try:
-                organization = Organization.objects.get(id=kwargs.get('id'))
-            except Organization.DoesNotExist:
-                return Response({"detail": "Organization not found."}, status=status.HTTP_404_NOT_FOUND)
-
-            try:
-                membership = Membership.objects.get(user=request.user, organization=organization)
-            except Membership.DoesNotExist:
-                return Response({"detail": "You do not have the required permissions."}, status=status.HTTP_403_FORBIDDEN)
-
-            if required_roles and membership.role not in required_roles:
-                return Response({"detail": "You do not have the required permissions."}, status=status.HTTP_403_FORBIDDEN)
-
-            request.organization = organization
-            request.membership = membership
+            error = check_organization_permission(request, kwargs.get('id'), required_roles)
+            if error is not None:
+                return error
 
             return func(request, *args, **kwargs)
         return wrapper
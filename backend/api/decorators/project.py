@@ -1,53 +1,54 @@
 from functools import wraps
+from typing import List, Optional
 from rest_framework.response import Response
 from rest_framework import status
 from db.models.project import Project
 from db.models.organization import Membership
+from utils.permission import get_membership
 
 
-def project_basic_permission_required(func):
-    @wraps(func)
-    def wrapper(request, *args, **kwargs):
-        try:
-            project = Project.objects.get(id=kwargs.get('id'))
-        except Project.DoesNotExist:
-            return Response({"detail": "Project not found."}, status=status.HTTP_404_NOT_FOUND)
-        
-        user = request.user
-        if project.is_user_project():
-            if project.owner != user:
-                return Response({"detail": "You do not have the required permissions."}, status=status.HTTP_403_FORBIDDEN)
-        elif project.is_organization_project():
-            organization = project.owner
-            membership = Membership.objects.filter(organization=organization, user=user).exclude(role=Membership.PENDING)
-            if not membership.exists():
-                return Response({"detail": "You do not have the required permissions."}, status=status.HTTP_403_FORBIDDEN)
-        
-        request.project = project
-
-        return func(request, *args, **kwargs)
-    return wrapper
-
-
-def project_advanced_permission_required(func):
-    @wraps(func)
-    def wrapper(request, *args, **kwargs):
-        try:
-            project = Project.objects.get(id=kwargs.get('id'))
-        except Project.DoesNotExist:
-            return Response({"detail": "Project not found."}, status=status.HTTP_404_NOT_FOUND)
-        
-        user = request.user
-        if project.is_user_project():
-            if project.owner != user:
-                return Response({"detail": "You do not have the required permissions."}, status=status.HTTP_403_FORBIDDEN)
-        elif project.is_organization_project():
-            organization = project.owner
-            membership = Membership.objects.filter(organization=organization, user=user, role=Membership.OWNER)
-            if not membership.exists():
-                return Response({"detail": "You do not have the required permissions."}, status=status.HTTP_403_FORBIDDEN)
-        
-        request.project = project
-
-        return func(request, *args, **kwargs)
-    return wrapper
+def check_project_permission(request, id, required_roles: List[str]) -> Optional[Response]:
+    """
+    Check the authenticated user's access to a project, and attach `request.project` on success.
+    Personal projects are only accessible to their owner, organization projects to the given roles.
+
+    :return: None if permitted, otherwise a 403 or 404 response.
+    """
+    try:
+        project = Project.objects.get(id=id)
+    except Project.DoesNotExist:
+        return Response({"detail": "Project not found."}, status=status.HTTP_404_NOT_FOUND)
+
+    user = request.user
+    if project.is_user_project():
+        if project.owner_id != user.id:
+            return Response({"detail": "You do not have the required permissions."}, status=status.HTTP_403_FORBIDDEN)
+    elif project.is_organization_project():
+        membership = get_membership(request, project.owner_id)
+        if membership is None or membership.role not in required_roles:
+            return Response({"detail": "You do not have the required permissions."}, status=status.HTTP_403_FORBIDDEN)
+
+    request.project = project
+    return None
+
+
+def _project_permission_required(required_roles):
+    def decorator(func):
+        @wraps(func)
+        def wrapper(request, *args, **kwargs):
+            error = check_project_permission(request, kwargs.get('id'), required_roles)
+            if error is not None:
+                return error
+
+            return func(request, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+PROJECT_BASIC_ROLES = [Membership.OWNER, Membership.MEMBER]
+
+PROJECT_ADVANCED_ROLES = [Membership.OWNER]
+
+project_basic_permission_required = _project_permission_required(PROJECT_BASIC_ROLES)
+
+project_advanced_permission_required = _project_permission_required(PROJECT_ADVANCED_ROLES)
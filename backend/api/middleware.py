@@ -0,0 +1,100 @@
+from typing import Callable, Dict, Optional
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.text import compress_string
+
+try:
+    import brotli  # optional
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard  # optional
+except ImportError:
+    zstandard = None
+
+
+def _compress_gzip(content: bytes) -> bytes:
+    # Same as Django's GZipMiddleware, with a random filename against BREACH-style length attacks
+    return compress_string(content, max_random_bytes=100)
+
+
+def _compress_br(content: bytes) -> bytes:
+    return brotli.compress(content, quality=4)  # the higher qualities are too slow for dynamic content
+
+
+def _compress_zstd(content: bytes) -> bytes:
+    return zstandard.ZstdCompressor(level=3).compress(content)
+
+
+def _get_compressors() -> Dict[str, Callable[[bytes], bytes]]:
+    """ The available content codings, in order of preference """
+    compressors = {}
+    if zstandard is not None:
+        compressors['zstd'] = _compress_zstd
+    if brotli is not None:
+        compressors['br'] = _compress_br
+    compressors['gzip'] = _compress_gzip
+    return compressors
+
+
+def negotiate_encoding(accept_encoding: str, available) -> Optional[str]:
+    """
+    Pick a content coding from an Accept-Encoding header, by quality value, then by order of `available`.
+
+    :return: None when the client accepts none of them.
+    """
+    qualities = {}
+    for item in accept_encoding.split(','):
+        coding, _, params = item.strip().partition(';')
+        coding = coding.strip().lower()
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        qualities[coding] = quality
+    best, best_quality = None, 0.0
+    for coding in available:
+        quality = qualities.get(coding, qualities.get('*', 0.0))
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    Compress JSON responses of at least RESPONSE_COMPRESSION_MIN_SIZE bytes with the best coding accepted
+    by the client: zstd or brotli when `zstandard` / `brotli` are installed, otherwise gzip.
+    Streaming responses (e.g. event streams) and other content types are left alone.
+    """
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.compressors = _get_compressors()
+        self.min_size = getattr(settings, 'RESPONSE_COMPRESSION_MIN_SIZE', 1024)
+
+    def process_response(self, request, response):
+        if response.streaming or response.has_header('Content-Encoding'):
+            return response
+        if not response.get('Content-Type', '').startswith('application/json') or len(response.content) < self.min_size:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        coding = negotiate_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''), self.compressors)
+        if coding is None:
+            return response
+
+        compressed_content = self.compressors[coding](response.content)
+        if len(compressed_content) >= len(response.content):
+            return response
+        response.content = compressed_content
+        response.headers['Content-Length'] = str(len(response.content))
+        # Same as GZipMiddleware, a strong ETag no longer matches the bytes sent
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = coding
+        return response
@@ -0,0 +1,32 @@
+from django.db import migrations, OperationalError
+
+
+class SQLiteRunSQL(migrations.RunSQL):
+    """
+    RunSQL on SQLite databases only. SQLite builds without FTS5 (or older than 3.34, without
+    the trigram tokenizer) are skipped, full-text search then falls back to `icontains`.
+    """
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'sqlite':
+            try:
+                super().database_forwards(app_label, schema_editor, from_state, to_state)
+            except OperationalError:
+                pass
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'sqlite':
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+
+
+class Migration(migrations.Migration):
+    # Full-text index of utils.search.SQLiteFTSBackend
+
+    dependencies = []
+
+    operations = [
+        SQLiteRunSQL(
+            sql="CREATE VIRTUAL TABLE search_index USING fts5("
+                "content, target_type UNINDEXED, target_id UNINDEXED, tokenize='trigram')",
+            reverse_sql="DROP TABLE IF EXISTS search_index",
+        ),
+    ]
@@ -0,0 +1,89 @@
+import enum
+import gc
+from rest_framework import renderers
+from rest_framework.utils import encoders
+
+try:
+    import orjson  # optional, a faster JSON encoder
+except ImportError:
+    orjson = None
+
+_PLAIN_TYPES = frozenset({str, int, bool, type(None), float, dict, list, tuple})
+_encoder = encoders.JSONEncoder()
+
+
+def _is_json_float(value: float) -> bool:
+    """
+    Whether orjson encodes the float like `json`, i.e. it is finite and `repr()` does not use exponent notation,
+    which orjson spells differently (`1e16` and `0.00001` rather than `1e+16` and `1e-05`)
+    """
+    return value == 0 or 1e-4 <= abs(value) < 1e16
+
+
+def _has_json_floats(data) -> bool:
+    """
+    Whether every float nested in the data is encoded by orjson like by `json`.
+    The containers are walked a level at a time with `gc.get_referents()`, objects of other types
+    (datetimes, Decimal...) are converted by the encoder hook, which checks the floats it returns.
+    """
+    level = [data]
+    while level:
+        types = set(map(type, level))
+        if float in types and not all(_is_json_float(value) for value in level if type(value) is float):
+            return False
+        nested = []
+        if not types <= _PLAIN_TYPES:
+            # e.g. ReturnList or OrderedDict, walked without the attributes of the subclass
+            for value in level:
+                if type(value) in _PLAIN_TYPES:
+                    continue
+                if isinstance(value, float) or isinstance(value, enum.Enum) and not isinstance(value, (int, str)):
+                    return False  # rejected by the encoder hook, which orjson skips for enums
+                if isinstance(value, dict):
+                    nested += [*value, *value.values()]
+                elif isinstance(value, (list, tuple)):
+                    nested += value
+            level = [value for value in level if type(value) in _PLAIN_TYPES]
+        level = [*gc.get_referents(*level), *nested]
+    return True
+
+
+def _default(obj):
+    value = _encoder.default(obj)
+    if not isinstance(value, str) and not _has_json_floats(value):
+        raise TypeError('Left to the standard renderer.')  # orjson raises JSONEncodeError
+    return value
+
+
+class FastJSONRenderer(renderers.JSONRenderer):
+    """
+    JSON renderer encoding with orjson when it is installed, with the same output as DRF's `JSONRenderer`:
+    datetimes, Decimal, UUID, lazy strings etc. are converted by the same encoder hooks, and anything orjson
+    cannot encode (e.g. integers above 64 bits, keys other than strings, indentation other than 2)
+    goes through the standard renderer.
+
+    So do payloads holding floats that orjson encodes differently, i.e. of very small or large magnitude,
+    or NaN/Infinity (null rather than rejected).
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or self.ensure_ascii or not self.compact \
+                or self.encoder_class is not encoders.JSONEncoder:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if indent not in (None, 2):
+            return super().render(data, accepted_media_type, renderer_context)
+        option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+        if indent == 2:
+            option |= orjson.OPT_INDENT_2
+        try:
+            # also rejects circular references, before walking the data
+            ret = orjson.dumps(data, default=_default, option=option)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        if not _has_json_floats(data):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Same as JSONRenderer, a strict javascript subset
+        return ret.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
@@ -1,37 +1,70 @@
-PROPERTY_SCHEMA = {
+COLORS = ["gray", "red", "orange", "yellow", "green", "teal", "blue", "cyan", "purple", "pink"]
+
+LABEL_PROPERTY_SCHEMA = {
     "type": "object",
     "properties": {
-        "label": {
-            "type": "object",
-            "properties": {
-                "type": {"type": "string", "enum": ["label"]},
-                "name": {"type": "string"},
-                "options": {
-                    "type": "array",
-                    "items": {
-                        "type": "object",
-                        "properties": {
-                            "id": {"type": "integer"},
-                            "name": {"type": "string"},
-                            "color": {
-                                "type": "string",
-                                "enum": ["gray", "red", "orange", "yellow", "green", "teal", "blue", "cyan", "purple", "pink"]
-                            }
-                        },
-                        "required": ["id", "name", "color"]
+        "type": {"type": "string", "enum": ["label"]},
+        "name": {"type": "string"},
+        "options": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "id": {"type": "integer"},
+                    "name": {"type": "string"},
+                    "color": {
+                        "type": "string",
+                        "enum": COLORS
                     }
-                }
-            },
-            "required": ["type", "name", "options"]
-        },
-        "number": {
-            "type": "object",
-            "properties": {
-                "type": {"type": "string", "enum": ["number"]},
-                "name": {"type": "string"}
-            },
-            "required": ["type", "name"]
+                },
+                "required": ["id", "name", "color"]
+            }
         }
     },
-    "additionalProperties": False
+    "required": ["type", "name", "options"]
+}
+
+NUMBER_PROPERTY_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "type": {"type": "string", "enum": ["number"]},
+        "name": {"type": "string"}
+    },
+    "required": ["type", "name"]
+}
+
+# A global property definition of a task collection, e.g. {"type": "number", "name": "Estimate"}
+PROPERTY_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "type": {"type": "string", "enum": ["label", "number"]}
+    },
+    "required": ["type"],
+    "allOf": [
+        {"if": {"properties": {"type": {"const": "label"}}}, "then": LABEL_PROPERTY_SCHEMA},
+        {"if": {"properties": {"type": {"const": "number"}}}, "then": NUMBER_PROPERTY_SCHEMA}
+    ]
 }
+
+
+def property_values_schema(definitions: list) -> dict:
+    """
+    Schema of the `global_properties` of a task, given the definitions of its collection.
+    Values are keyed by property name: label properties take an option id (or a list of them),
+    number properties a number, and both accept null.
+    """
+    properties = {}
+    for prop in definitions:
+        if prop['type'] == 'label':
+            option_ids = [option['id'] for option in prop['options']]
+            option = {"enum": option_ids} if option_ids else {"not": {}}
+            properties[prop['name']] = {
+                "anyOf": [{"type": "null"}, option, {"type": "array", "items": option, "uniqueItems": True}]
+            }
+        elif prop['type'] == 'number':
+            properties[prop['name']] = {"type": ["number", "null"]}
+    return {
+        "type": "object",
+        "properties": properties,
+        "additionalProperties": False
+    }
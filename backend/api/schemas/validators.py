@@ -0,0 +1,62 @@
+import threading
+from typing import Dict, Tuple
+from jsonschema import ValidationError
+from jsonschema.exceptions import best_match
+from jsonschema.validators import validator_for
+from api.schemas.task import PROPERTY_SCHEMA, property_values_schema
+
+try:
+    import fastjsonschema  # optional, generates Python code for each schema
+except ImportError:
+    fastjsonschema = None
+
+
+class SchemaValidator:
+    """
+    A JSON Schema checked and compiled once, reusable for any number of instances.
+    Compiled with fastjsonschema when it is installed, otherwise with a jsonschema validator.
+    """
+    def __init__(self, schema: dict):
+        validator_class = validator_for(schema)
+        validator_class.check_schema(schema)
+        if fastjsonschema is not None:
+            self._validate = fastjsonschema.compile(schema)
+        else:
+            self._validator = validator_class(schema)
+
+    def validate(self, instance):
+        """
+        :raises jsonschema.ValidationError: If the instance is invalid, whichever the engine.
+        """
+        if fastjsonschema is None:
+            error = best_match(self._validator.iter_errors(instance))
+            if error is not None:
+                raise error
+            return
+        try:
+            self._validate(instance)
+        except fastjsonschema.JsonSchemaException as e:
+            raise ValidationError(e.message)
+
+
+property_validator = SchemaValidator(PROPERTY_SCHEMA)
+
+_values_validators: Dict[Tuple[int, int], SchemaValidator] = {}
+_values_validators_lock = threading.Lock()
+_VALUES_VALIDATORS_MAX_SIZE = 256
+
+
+def get_property_values_validator(collection) -> SchemaValidator:
+    """
+    Validator of the `global_properties` of the tasks in a collection,
+    compiled once per revision of the collection's property definitions.
+    """
+    key = (collection.pk, collection.revision)
+    validator = _values_validators.get(key)
+    if validator is None:
+        validator = SchemaValidator(property_values_schema(collection.global_properties))
+        with _values_validators_lock:
+            if len(_values_validators) >= _VALUES_VALIDATORS_MAX_SIZE:
+                del _values_validators[next(iter(_values_validators))]  # oldest first
+            _values_validators[key] = validator
+    return validator
@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from db.models.discussion import Discussion, DiscussionTopic, DiscussionComment, DiscussionCategory
 from api.serializers.user import UserBasicInfoSerializer
+from api.serializers.values import ValuesSerializer, DATETIME
 
 
 class DiscussionSerializer(serializers.ModelSerializer):
@@ -27,6 +28,25 @@ class DiscussionCommentSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'user', 'topic', 'created_at', 'updated_at', 'local_id', 'edited']
 
 
+class DiscussionCommentValuesSerializer(ValuesSerializer):
+    """ Fast path of `DiscussionCommentSerializer` for comment lists, with the users in the same query """
+    fields = {
+        'id': 'id',
+        'user': {
+            'id': 'user__id',
+            'display_name': 'user__display_name',
+            'biography': 'user__biography',
+            'username': 'user__username',
+        },
+        'topic': 'topic_id',
+        'content': 'content',
+        'created_at': ('created_at', DATETIME),
+        'updated_at': ('updated_at', DATETIME),
+        'local_id': 'local_id',
+        'edited': 'edited',
+    }
+
+
 class DiscussionTopicSerializer(serializers.ModelSerializer):
     user = serializers.SerializerMethodField(read_only=True)
     category = DiscussionCategorySerializer(read_only=True)
@@ -43,10 +63,11 @@ class DiscussionTopicSerializer(serializers.ModelSerializer):
         model = DiscussionTopic
         fields = [
             'id', 'title', 'category', 'category_id', 'local_id', 'deleted',
-            'created_at', 'updated_at', 'user', 'comment'
+            'created_at', 'updated_at', 'user', 'comment', 'comment_count', 'last_comment_at'
         ]
         read_only_fields = [
-            'id', 'category', 'local_id', 'deleted', 'created_at', 'updated_at', 'comment'
+            'id', 'category', 'local_id', 'deleted', 'created_at', 'updated_at', 'comment',
+            'comment_count', 'last_comment_at'
         ]
         depth = 1
 
@@ -67,6 +88,9 @@ class DiscussionTopicSerializer(serializers.ModelSerializer):
         return data
 
     def get_user(self, obj):
+        if obj.author_id:
+            return UserBasicInfoSerializer(obj.author).data
+        # topics created before `author` was denormalized
         earliest_comment = obj.comments.order_by('created_at').first()
         if earliest_comment:
             return UserBasicInfoSerializer(earliest_comment.user).data
@@ -85,6 +109,7 @@ class DiscussionTopicSerializer(serializers.ModelSerializer):
                 user=self.context['request'].user,
                 **comment_data
             )
+            topic.refresh_from_db(fields=['author', 'comment_count', 'last_comment_at', 'updated_at'])
         return topic
 
 
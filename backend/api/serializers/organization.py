@@ -1,8 +1,12 @@
 from rest_framework import serializers
 from django.contrib.contenttypes.models import ContentType
+from django.db.models import Count, Exists, OuterRef, Q, QuerySet, Subquery, IntegerField
+from django.db.models.functions import Coalesce
 from db.models.organization import Organization, Membership
+from db.models.discussion import Discussion
 from db.models.project import Project
 from api.serializers.user import UserBasicInfoSerializer
+from api.serializers.values import ValuesSerializer, DATETIME
 
 class MembershipSerializer(serializers.ModelSerializer):
     user = UserBasicInfoSerializer()
@@ -12,6 +16,20 @@ class MembershipSerializer(serializers.ModelSerializer):
         fields = ['user', 'role', 'joined_at']
 
 
+class MembershipValuesSerializer(ValuesSerializer):
+    """ Fast path of `MembershipSerializer` for member lists, with the users in the same query """
+    fields = {
+        'user': {
+            'id': 'user__id',
+            'display_name': 'user__display_name',
+            'biography': 'user__biography',
+            'username': 'user__username',
+        },
+        'role': 'role',
+        'joined_at': ('joined_at', DATETIME),
+    }
+
+
 class OrganizationSerializer(serializers.ModelSerializer):
     role = serializers.SerializerMethodField(read_only=True)
     member_count = serializers.SerializerMethodField()  # All members, include owner
@@ -23,22 +41,58 @@ class OrganizationSerializer(serializers.ModelSerializer):
         model = Organization
         fields = ['id', 'display_name', 'description', 'created_at', 'updated_at', 'role', 'member_count', 'owner_count', 'project_count', 'is_discussion_enabled']
         read_only_fields = ['id', 'created_at', 'updated_at', 'role', 'member_count', 'owner_count', 'project_count', 'is_discussion_enabled']
-        
+
+    @staticmethod
+    def annotate_queryset(queryset: QuerySet, user) -> QuerySet:
+        """
+        Annotate an Organization queryset with every value the serializer needs,
+        so a list of organizations is serialized without per-row queries.
+
+        :param queryset: Organization queryset to annotate.
+        :param user: The user whose role is resolved for each organization.
+        """
+        project_count = Project.objects.filter(
+            owner_type=ContentType.objects.get_for_model(Organization),
+            owner_id=OuterRef('pk')
+        ).order_by().values('owner_id').annotate(count=Count('pk')).values('count')
+
+        return queryset.annotate(
+            role=Subquery(
+                Membership.objects.filter(organization=OuterRef('pk'), user=user).values('role')[:1]
+            ),
+            member_count=Count('membership', filter=~Q(membership__role=Membership.PENDING), distinct=True),
+            owner_count=Count('membership', filter=Q(membership__role=Membership.OWNER), distinct=True),
+            project_count=Coalesce(Subquery(project_count, output_field=IntegerField()), 0),
+            is_discussion_enabled=Exists(Discussion.objects.filter(organization=OuterRef('pk'))),
+        )
+
+    # Each getter prefers the value precomputed by annotate_queryset(),
+    # and falls back to a query for single, non-annotated instances.
     def get_role(self, obj):
+        if hasattr(obj, 'role'):
+            return obj.role
         user = self.context['request'].user
         membership = Membership.objects.filter(user=user, organization=obj).first()
         return membership.role if membership else None
     
     def get_member_count(self, obj):
+        if hasattr(obj, 'member_count'):
+            return obj.member_count
         return Membership.objects.filter(organization=obj).exclude(role=Membership.PENDING).count()
     
     def get_owner_count(self, obj):
+        if hasattr(obj, 'owner_count'):
+            return obj.owner_count
         return Membership.objects.filter(organization=obj, role=Membership.OWNER).count()
     
     def get_project_count(self, obj):
+        if hasattr(obj, 'project_count'):
+            return obj.project_count
         return Project.objects.filter(owner_type=ContentType.objects.get_for_model(Organization), owner_id=obj.id).count()
     
     def get_is_discussion_enabled(self, obj):
+        if hasattr(obj, 'is_discussion_enabled'):
+            return obj.is_discussion_enabled
         return hasattr(obj, "discussion")
 
     # def validate(self, data):
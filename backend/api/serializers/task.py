@@ -1,7 +1,8 @@
 from rest_framework import serializers
-from jsonschema import validate, ValidationError as JSONSchemaValidationError
+from jsonschema import ValidationError as JSONSchemaValidationError
 from db.models.task import TaskCollection, Task
-from api.schemas.task import PROPERTY_SCHEMA
+from api.schemas.validators import property_validator, get_property_values_validator
+from api.serializers.values import ValuesSerializer, DATETIME
 
 class TaskCollectionSerializer(serializers.ModelSerializer):
     class Meta:
@@ -11,7 +12,7 @@ class TaskCollectionSerializer(serializers.ModelSerializer):
     def validate_global_properties(self, value):
         for prop in value:
             try:
-                validate(instance=prop, schema=PROPERTY_SCHEMA)
+                property_validator.validate(prop)
             except JSONSchemaValidationError as e:
                 raise serializers.ValidationError(f"Invalid global property definition: {e.message}")
         return value
@@ -23,4 +24,64 @@ class TaskSerializer(serializers.ModelSerializer):
         fields = ['id', 'title', 'description', 'local_id', 'created_at', 'updated_at', 'archived', 'deleted', 'global_properties', 'local_properties']
         read_only_fields = ['id', 'local_id', 'created_at', 'updated_at', 'deleted']
 
+    def _get_collection(self):
+        return self.context.get('collection') or (self.instance.collection if isinstance(self.instance, Task) else None)
 
+    def validate_global_properties(self, value):
+        # Values are checked against the definitions of the collection, given in the context
+        collection = self._get_collection()
+        if collection is not None:
+            try:
+                get_property_values_validator(collection).validate(value)
+            except JSONSchemaValidationError as e:
+                raise serializers.ValidationError(f"Invalid global property value: {e.message}")
+        return value
+
+    def validate(self, attrs):
+        collection = self._get_collection()
+        if 'global_properties' in attrs and collection is not None:
+            attrs['properties_revision'] = collection.revision
+        return attrs
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        # Values older than the last removal of a definition may hold it, hidden until they are cleaned up
+        collection = self.context.get('collection')
+        if collection is not None and instance.properties_revision < collection.removal_revision:
+            if getattr(self, '_defined_revision', None) != collection.revision:
+                self._defined = {prop['name'] for prop in collection.global_properties}
+                self._defined_revision = collection.revision
+            data['global_properties'] = {
+                name: value for name, value in data['global_properties'].items() if name in self._defined
+            }
+        return data
+
+
+class TaskValuesSerializer(ValuesSerializer):
+    """ Fast path of `TaskSerializer` for task lists """
+    fields = {
+        'id': 'id',
+        'title': 'title',
+        'description': 'description',
+        'local_id': 'local_id',
+        'created_at': ('created_at', DATETIME),
+        'updated_at': ('updated_at', DATETIME),
+        'archived': 'archived',
+        'deleted': 'deleted',
+        'global_properties': 'global_properties',
+        'local_properties': 'local_properties',
+    }
+    extra_lookups = ['properties_revision']
+
+    def to_representation(self, row, field_map):
+        data = super().to_representation(row, field_map)
+        # Same as TaskSerializer, values older than the last removal may hold removed properties
+        collection = self.context.get('collection')
+        if collection is not None and 'global_properties' in data and row['properties_revision'] < collection.removal_revision:
+            if getattr(self, '_defined_revision', None) != collection.revision:
+                self._defined = {prop['name'] for prop in collection.global_properties}
+                self._defined_revision = collection.revision
+            data['global_properties'] = {
+                name: value for name, value in data['global_properties'].items() if name in self._defined
+            }
+        return data
@@ -0,0 +1,81 @@
+from datetime import datetime, tzinfo
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+from django.utils import timezone
+
+DATETIME = 'datetime'  # converter of datetime fields, bound to the current timezone once per list
+
+
+def format_datetime(value: datetime, tz: tzinfo) -> str:
+    """ Same output as DRF's DateTimeField with the default ISO 8601 format, `tz` being the current timezone """
+    if timezone.is_aware(value):
+        value = value.astimezone(tz)
+    value = value.isoformat()
+    if value.endswith('+00:00'):
+        value = value[:-6] + 'Z'
+    return value
+
+
+class ValuesSerializer:
+    """
+    Read-only serializer of list payloads, built from `QuerySet.values()` rows instead of model instances,
+    for list endpoints where DRF's per-field `to_representation` dominates. Subclasses produce the same
+    output as their `ModelSerializer` counterpart and are used in its place, e.g. with `paginated_serialize`.
+
+    `fields` maps each output key, in output order, to a lookup (possibly across relations), a
+    (lookup, converter) pair, the converter being a callable or DATETIME, or a nested {key: lookup} object,
+    None when its first lookup is null.
+    The rows select `lookups()`, e.g. with `QueryExecutor(..., values=Serializer.lookups())`, in a single query.
+    """
+    fields: Dict[str, Union[str, Tuple[str, Callable[[Any], Any]], Dict[str, str]]] = {}
+    extra_lookups: List[str] = []  # selected for `to_representation` overrides, not serialized
+
+    def __init__(self, instance, many: bool = True, context: Optional[dict] = None, fields: List[str] = None):
+        """
+        :param instance: `values()` rows selecting `lookups()`.
+        :param fields: Output keys to serialize, all of them by default.
+        """
+        assert many, "ValuesSerializer only serializes lists."
+        self.instance = instance
+        self.context = context or {}
+        self.field_names = fields
+
+    @classmethod
+    def _field_map(cls, fields: List[str] = None) -> List[Tuple[str, Any, Optional[Callable]]]:
+        """ (key, lookup or nested [(key, lookup)], converter) of each serialized field """
+        datetime_converter = partial(format_datetime, tz=timezone.get_current_timezone())
+        field_map = []
+        for key, spec in cls.fields.items():
+            if fields is not None and key not in fields:
+                continue
+            if isinstance(spec, dict):
+                field_map.append((key, list(spec.items()), None))
+            elif isinstance(spec, tuple):
+                field_map.append((key, spec[0], datetime_converter if spec[1] == DATETIME else spec[1]))
+            else:
+                field_map.append((key, spec, None))
+        return field_map
+
+    @classmethod
+    def lookups(cls, fields: List[str] = None) -> List[str]:
+        """ The lookups the rows must select to serialize `fields`, all of them by default """
+        lookups = ['pk', *cls.extra_lookups]  # pk: tie-breaker of cursor pagination
+        for _, lookup, _ in cls._field_map(fields):
+            lookups += [nested_lookup for _, nested_lookup in lookup] if isinstance(lookup, list) else [lookup]
+        return lookups
+
+    def to_representation(self, row: dict, field_map) -> dict:
+        data = {}
+        for key, lookup, converter in field_map:
+            if isinstance(lookup, list):
+                data[key] = {nested_key: row[nested_lookup] for nested_key, nested_lookup in lookup} \
+                    if row[lookup[0][1]] is not None else None
+                continue
+            value = row[lookup]
+            data[key] = converter(value) if converter is not None and value is not None else value
+        return data
+
+    @property
+    def data(self) -> List[dict]:
+        field_map = self._field_map(self.field_names)  # resolved once per list rather than per row
+        return [self.to_representation(row, field_map) for row in self.instance]
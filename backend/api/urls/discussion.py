@@ -1,8 +1,10 @@
 from django.urls import path
 from api.views.discussion import *
+from api.views.events import stream_discussion_events
 
 urlpatterns = [
     path('enable/', enable_discussion, name='enable_discussion'),
+    path('events/', stream_discussion_events, name='stream_discussion_events'),
 
     #topic CRUD
     path('topic/create/', create_topic, name='create_topic'),
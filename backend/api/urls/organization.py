@@ -17,6 +17,7 @@ urlpatterns = [
 
     # Invitation CRUD
     path('<int:id>/invite/create/', create_invitation, name='create_invitation'),
+    path('<int:id>/invite/bulk-create/', bulk_create_invitations, name='bulk_create_invitations'),
     path('<int:id>/invite/list/', list_organization_invitations, name='list_organization_invitations'),
     path('<int:id>/invite/respond/', respond_invitation, name='respond_invitation'),
     path('<int:id>/invite/cancel/', cancel_invitation, name='cancel_invitation'),
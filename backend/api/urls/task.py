@@ -1,14 +1,20 @@
 from django.urls import path
 from api.views.task import *
+from api.views.events import stream_task_events
 
 urlpatterns = [
     # Task CRUD
     path('create/', create_task, name='create_task'),
+    path('bulk-create/', bulk_create_tasks, name='bulk_create_tasks'),
     path('list/', list_tasks, name='list_tasks'),
+    path('search/', search_tasks, name='search_tasks'),
+    path('sync/', sync_tasks, name='sync_tasks'),
+    path('events/', stream_task_events, name='stream_task_events'),
     path('update/', update_task, name='update_task'),
     path('pin/', pin_task, name='pin_task'),
     path('unpin/', unpin_task, name='unpin_task'),
     path('delete/', delete_tasks_by_batch, name='delete_tasks_by_batch'),
+    path('archive/', archive_tasks_by_batch, name='archive_tasks_by_batch'),
 
     # global property
     path('g-prop/update/', add_or_update_global_property, name='add_or_update_global_property'),
@@ -11,8 +11,9 @@ from rest_framework.throttling import UserRateThrottle
 from rest_framework.decorators import throttle_classes
 from db.models.discussion import Discussion
 from api.decorators.organization import organization_permission_classes
+from api.decorators.etag import etag_condition
 from api.serializers.discussion import *
-from utils.query import QuerySteps, QueryExecutor, QueryOptions
+from utils.query import QuerySteps, QueryExecutor, QueryOptions, get_request_params
 
 
 class DiscussionThrottle(UserRateThrottle):
@@ -91,6 +92,36 @@ def create_topic(request, id):
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+def _topic_info_version(request, id):
+    version = DiscussionTopic.objects.filter(
+        discussion__organization=request.organization, local_id=get_request_params(request).get('topic_local_id'),
+        deleted=False
+    ).values_list(
+        'pk', 'updated_at', 'comment_count', 'last_comment_at', 'category_id', 'discussion__revision',
+        'author', 'author__username', 'author__display_name', 'author__biography'
+    ).first()
+    if version is None or version[6] is None:  # not found, or author not denormalized yet
+        return None
+    return version
+
+
+@swagger_auto_schema(
+    method='get',
+    manual_parameters=[
+        openapi.Parameter('topic_local_id', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, required=True)
+    ],
+    responses={
+        200: openapi.Response(
+            description="Discussion topic retrieved successfully",
+            schema=DiscussionTopicSerializer
+        ),
+        304: openapi.Response(description="Not modified since the ETag in If-None-Match"),
+        404: openapi.Response(description="Topic not found or has been deleted"),
+        403: openapi.Response(description="Authenticated user does not have the required permissions"),
+    },
+    operation_description="Retrieve a discussion topic in this organization, conditionally with If-None-Match.",
+    tags=["Organization/Discussion"]
+)
 @swagger_auto_schema(
     method='post',
     request_body=openapi.Schema(
@@ -109,28 +140,43 @@ def create_topic(request, id):
     operation_description="Retrieve a discussion topic in this organization.",
     tags=["Organization/Discussion"]
 )
-@api_view(['POST'])
+@api_view(['GET', 'POST'])
 @authentication_classes([SessionAuthentication])
 @permission_classes([IsAuthenticated])
 @organization_permission_classes(['Owner', 'Member'])
+@etag_condition(_topic_info_version)
 def get_topic_info(request, id):
     organization = request.organization
     if not hasattr(organization, 'discussion'):
         return Response({'detail': 'Discussion not enabled in this organization'}, status=status.HTTP_404_NOT_FOUND)
-    topic_local_id = request.data.get('topic_local_id')
+    topic_local_id = get_request_params(request).get('topic_local_id')
     try:
-        topic = DiscussionTopic.objects.get(discussion=organization.discussion, local_id=topic_local_id, deleted=False)
+        topic = DiscussionTopic.objects.select_related('author', 'category').get(
+            discussion=organization.discussion, local_id=topic_local_id, deleted=False
+        )
     except DiscussionTopic.DoesNotExist:
         return Response({'detail': 'Topic not found or has been deleted'}, status=status.HTTP_404_NOT_FOUND)
     serializer = DiscussionTopicSerializer(topic)
     return Response(serializer.data, status=status.HTTP_200_OK)
 
 
+TOPIC_FILTER_LOOKUPS = {
+    'local_id': ['exact', 'in', 'gt', 'gte', 'lt', 'lte'],
+    'title': ['exact', 'icontains', 'startswith'],
+    'category': ['exact', 'in', 'isnull'],
+    'created_at': ['gt', 'gte', 'lt', 'lte'],
+    'updated_at': ['gt', 'gte', 'lt', 'lte'],
+    'last_comment_at': ['gt', 'gte', 'lt', 'lte', 'isnull'],
+    'comment_count': ['exact', 'gt', 'gte', 'lt', 'lte'],
+}
+TOPIC_ORDERING_FIELDS = ['updated_at', 'created_at', 'last_comment_at', 'comment_count']
+
+
 # topic list
 @swagger_auto_schema(
     method='post',
     request_body=QueryOptions.to_openapi_schema(
-        [QuerySteps.PAGINATION, QuerySteps.FILTERS]
+        [QuerySteps.PAGINATION, QuerySteps.CURSOR, QuerySteps.FILTERS, QuerySteps.SEARCH, QuerySteps.ORDER_BY]
     ),
     responses={
         200: openapi.Response(
@@ -140,7 +186,9 @@ def get_topic_info(request, id):
         404: openapi.Response(description="Organization not found, or discussion not enabled in this organization"),
         403: openapi.Response(description="Authenticated user does not have the required permissions"),
     },
-    operation_description="Retrieve a paginated list of discussion topics in this organization.",
+    operation_description="Retrieve a paginated list of discussion topics in this organization. "
+                          f"Filters on topic fields: {TOPIC_FILTER_LOOKUPS}, ordering by {TOPIC_ORDERING_FIELDS}. "
+                          "With a search term, topics whose title or comments match are ordered by relevance.",
     tags=["Organization/Discussion"]
 )
 @api_view(['POST'])
@@ -152,12 +200,18 @@ def list_topics(request, id):
     if not hasattr(organization, 'discussion'):
         return Response({'detail': 'Discussion not enabled in this organization'}, status=status.HTTP_404_NOT_FOUND)
 
-    base_query = DiscussionTopic.objects.filter(discussion=organization.discussion, deleted=False).order_by('-updated_at')
+    base_query = DiscussionTopic.objects.filter(
+        discussion=organization.discussion, deleted=False
+    ).select_related('author', 'category').order_by('-updated_at')
+    options = QueryOptions.build_from_request(request)
+    options.restrict(TOPIC_FILTER_LOOKUPS, TOPIC_ORDERING_FIELDS)
     result = QueryExecutor(
         base_query,
-        options=QueryOptions.build_from_request(request),
-        supported_steps=[QuerySteps.FILTERS, QuerySteps.PAGINATION]
-    ).execute().paginated_serialize(
+        options=options,
+        supported_steps=[QuerySteps.FILTERS, QuerySteps.SEARCH, QuerySteps.ORDER_BY, QuerySteps.PAGINATION, QuerySteps.CURSOR]
+    ).execute(
+        search_fields=['title', 'comments__content']
+    ).paginated_serialize(
         DiscussionTopicSerializer
     )
 
@@ -251,7 +305,7 @@ def create_comment(request, id):
 @swagger_auto_schema(
     method='post',
     request_body=QueryOptions.to_openapi_schema(
-        [QuerySteps.PAGINATION], 
+        [QuerySteps.PAGINATION, QuerySteps.CURSOR], 
         {'topic_local_id': openapi.Schema(type=openapi.TYPE_INTEGER)}
     ),
     responses={
@@ -282,9 +336,10 @@ def list_comment(request, id):
     result = QueryExecutor(
         base_query,
         options=QueryOptions.build_from_request(request),
-        supported_steps=[QuerySteps.PAGINATION]
+        supported_steps=[QuerySteps.PAGINATION, QuerySteps.CURSOR],
+        values=DiscussionCommentValuesSerializer.lookups()
     ).execute().paginated_serialize(
-        DiscussionCommentSerializer
+        DiscussionCommentValuesSerializer
     )
 
     return Response(result, status=status.HTTP_200_OK)
@@ -423,6 +478,32 @@ def create_category(request, id):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
 
+def _categories_version(request, id):
+    discussion = Discussion.objects.filter(organization=request.organization).values_list('pk', 'revision').first()
+    if discussion is None:
+        return None
+    return (*discussion, *QueryOptions.build_from_request(request).to_version())
+
+
+@swagger_auto_schema(
+    method='get',
+    manual_parameters=[
+        openapi.Parameter('page', openapi.IN_QUERY, type=openapi.TYPE_INTEGER),
+        openapi.Parameter('page_size', openapi.IN_QUERY, type=openapi.TYPE_INTEGER),
+        openapi.Parameter('count', openapi.IN_QUERY, type=openapi.TYPE_STRING),
+    ],
+    responses={
+        200: openapi.Response(
+            description="List of categories in the discussion",
+            schema=DiscussionCategorySerializer(many=True)
+        ),
+        304: openapi.Response(description="Not modified since the ETag in If-None-Match"),
+        403: openapi.Response(description="Authenticated user does not have the required permissions"),
+        404: openapi.Response(description="Discussion not found"),
+    },
+    operation_description="Retrieve a paginated list of categories in the discussion, conditionally with If-None-Match.",
+    tags=["Organization/Discussion"]
+)
 @swagger_auto_schema(
     method='post',
     request_body=QueryOptions.to_openapi_schema(
@@ -439,10 +520,11 @@ def create_category(request, id):
     operation_description="Retrieve a paginated list of categories in the discussion.",
     tags=["Organization/Discussion"]
 )
-@api_view(['POST'])
+@api_view(['GET', 'POST'])
 @authentication_classes([SessionAuthentication])
 @permission_classes([IsAuthenticated])
 @organization_permission_classes(['Owner', 'Member'])
+@etag_condition(_categories_version)
 def list_categories(request, id):
     organization = request.organization
     try:
@@ -0,0 +1,94 @@
+import asyncio
+import json
+from contextlib import suppress
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+from db.models.discussion import Discussion
+from db.models.task import TaskCollection
+from api.decorators.organization import check_organization_permission
+from api.decorators.project import check_project_permission, PROJECT_BASIC_ROLES
+from utils.events import get_event_broker, discussion_channel, task_collection_channel
+
+
+async def _event_stream(channel: str):
+    keepalive = getattr(settings, 'EVENT_STREAM_KEEPALIVE', 15)
+    events = get_event_broker().subscribe(channel)  # when the response starts, before anything is sent
+    next_event = None
+    try:
+        yield 'retry: 3000\n\n'
+        while True:
+            if next_event is None:
+                next_event = asyncio.ensure_future(events.__anext__())
+            done, _ = await asyncio.wait([next_event], timeout=keepalive)
+            if not done:
+                yield ': keepalive\n\n'  # keep proxies from closing an idle connection
+                continue
+            try:
+                event = next_event.result()
+            except StopAsyncIteration:
+                return
+            next_event = None
+            yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+    finally:
+        if next_event is not None:
+            next_event.cancel()
+            with suppress(asyncio.CancelledError, StopAsyncIteration):
+                await next_event
+        await events.aclose()
+
+
+def _stream_response(channel: str) -> StreamingHttpResponse:
+    response = StreamingHttpResponse(_event_stream(channel), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # disable nginx response buffering
+    return response
+
+
+async def _authenticate(request):
+    user = await request.auser()
+    if not user.is_authenticated:
+        return JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=403)
+    request.user = user
+    return None
+
+
+@require_GET
+async def stream_discussion_events(request, id):
+    """
+    Server-sent events of the topics and comments of an organization's discussion,
+    i.e. `topic.created`, `comment.updated`, ... with the local ids of the changed rows.
+    Served only under ASGI, a WSGI worker would be held for the whole connection.
+    """
+    error = await _authenticate(request)
+    if error is not None:
+        return error
+    error = await sync_to_async(check_organization_permission)(request, id, ['Owner', 'Member'])
+    if error is not None:
+        return JsonResponse(error.data, status=error.status_code)
+
+    discussion_id = await Discussion.objects.filter(organization=request.organization).values_list('id', flat=True).afirst()
+    if discussion_id is None:
+        return JsonResponse({'detail': 'Discussion not enabled in this organization'}, status=404)
+    return _stream_response(discussion_channel(discussion_id))
+
+
+@require_GET
+async def stream_task_events(request, id):
+    """
+    Server-sent events of the tasks of a project, i.e. `task.created`, `task.updated`,
+    `task.archived` and `task.deleted` with the local id of the task. After a `resync` event,
+    or a reconnection, clients should refresh the board with `task/sync/`.
+    """
+    error = await _authenticate(request)
+    if error is not None:
+        return error
+    error = await sync_to_async(check_project_permission)(request, id, PROJECT_BASIC_ROLES)
+    if error is not None:
+        return JsonResponse(error.data, status=error.status_code)
+
+    collection_id = await TaskCollection.objects.filter(project=request.project).values_list('id', flat=True).afirst()
+    if collection_id is None:
+        return JsonResponse({'detail': 'Task collection not found'}, status=404)
+    return _stream_response(task_collection_channel(collection_id))
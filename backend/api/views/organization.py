@@ -1,4 +1,5 @@
 from django.contrib.auth import get_user_model
+from django.db import transaction
 from django.contrib.contenttypes.models import ContentType
 from rest_framework import status
 from rest_framework.decorators import api_view, authentication_classes, permission_classes
@@ -10,10 +11,12 @@ from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 from db.models.organization import Organization, Membership
 from db.models.project import Project
-from api.serializers.organization import OrganizationSerializer, MembershipSerializer
+from api.serializers.organization import OrganizationSerializer, MembershipSerializer, MembershipValuesSerializer
 from api.decorators.organization import organization_permission_classes
+from api.decorators.etag import etag_condition
 from utils.query import QuerySteps, QueryExecutor, QueryOptions, QueryResult
-from utils.mails import send_email
+from utils.mails import send_email, send_emails
+from utils.revision import bump_revision
 
 User = get_user_model()
 
@@ -63,34 +66,41 @@ def create_organization(request):
 @authentication_classes([SessionAuthentication])
 @permission_classes([IsAuthenticated])
 def list_user_organizations(request):
-    base_query = Membership.objects.filter(user=request.user).exclude(role=Membership.PENDING)
-    options = QueryOptions.build_from_request(request)
-
-    if options.order_by.startswith('-'):
-        options.order_by = f"-organization__{options.order_by[1:]}"
-    else:
-        options.order_by = f"organization__{options.order_by}"
+    joined = Membership.objects.filter(user=request.user).exclude(role=Membership.PENDING).values('organization')
+    base_query = OrganizationSerializer.annotate_queryset(
+        Organization.objects.filter(id__in=joined).order_by('-updated_at'),
+        request.user
+    )
 
-    count, memberships = QueryExecutor(
+    response_data = QueryExecutor(
         base_query=base_query,
-        options=options,
+        options=QueryOptions.build_from_request(request),
         supported_steps=[QuerySteps.ORDER_BY, QuerySteps.PAGINATION]
-    ).execute()
-
-    organizations = [membership.organization for membership in memberships]
-    response_data = QueryResult(count, organizations).paginated_serialize(
+    ).execute().paginated_serialize(
         OrganizationSerializer,
         context={'request': request}
     )
     return Response(response_data, status=status.HTTP_200_OK)
 
 
+def _membership_info_version(request, id):
+    user, membership = request.user, request.membership
+    revision = Organization.objects.values_list('revision', flat=True).get(pk=id)
+    return (
+        user.id, user.username, user.display_name, user.biography,
+        membership.role, membership.joined_at, request.organization.updated_at, revision
+    )
+
+
 @swagger_auto_schema(
     method='get',
     responses={
         200: openapi.Response(
             description="Organization info and authenticated user's role"
         ),
+        304: openapi.Response(
+            description="Not modified since the ETag in If-None-Match"
+        ),
         404: openapi.Response(
             description="Organization not found"
         ),
@@ -105,6 +115,7 @@ def list_user_organizations(request):
 @authentication_classes([SessionAuthentication])
 @permission_classes([IsAuthenticated])
 @organization_permission_classes(required_roles=['Owner', 'Member', 'Pending'])
+@etag_condition(_membership_info_version)
 def check_user_organization_permission(request, id):
     membership = MembershipSerializer(request.membership, context={'request': request}).data
     organization = OrganizationSerializer(request.organization, context={'request': request}).data
@@ -194,9 +205,10 @@ def list_organization_members(request, id):
     result = QueryExecutor(
         base_query,
         options=QueryOptions.build_from_request(request),
-        supported_steps=[QuerySteps.PAGINATION]
+        supported_steps=[QuerySteps.PAGINATION],
+        values=MembershipValuesSerializer.lookups()
     ).execute().paginated_serialize(
-        MembershipSerializer
+        MembershipValuesSerializer
     )
 
     return Response(result, status=status.HTTP_200_OK)
@@ -361,6 +373,89 @@ def create_invitation(request, id):
     return Response({"detail": "Invitation sent successfully"}, status=status.HTTP_201_CREATED)
 
 
+BULK_INVITE_LIMIT = 500
+
+
+@swagger_auto_schema(
+    method='post',
+    request_body=openapi.Schema(
+        type=openapi.TYPE_OBJECT,
+        properties={
+            'usernames': openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Items(type=openapi.TYPE_STRING),
+                                        description=f'usernames of the users to invite, at most {BULK_INVITE_LIMIT}')
+        },
+        required=['usernames']
+    ),
+    responses={
+        201: openapi.Response(
+            description="Invitations sent, with the usernames invited, already in the organization and not found",
+            schema=openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                properties={
+                    'invited': openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Items(type=openapi.TYPE_STRING)),
+                    'already_members': openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Items(type=openapi.TYPE_STRING)),
+                    'not_found': openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Items(type=openapi.TYPE_STRING)),
+                }
+            )
+        ),
+        400: openapi.Response(description="Invalid usernames"),
+        403: openapi.Response(
+            description="Authenticated user is not an owner of this organization"
+        ),
+    },
+    operation_description="Invite many users to join the organization at once. Need 'Owner' permission.",
+    tags=["Organization/Membership"]
+)
+@api_view(['POST'])
+@authentication_classes([SessionAuthentication])
+@permission_classes([IsAuthenticated])
+@organization_permission_classes(['Owner'])
+def bulk_create_invitations(request, id):
+    usernames = request.data.get('usernames')
+    if not usernames or not isinstance(usernames, list) or not all(isinstance(name, str) for name in usernames):
+        return Response({"detail": "Invalid usernames. Must be a list of strings."}, status=status.HTTP_400_BAD_REQUEST)
+    if len(usernames) > BULK_INVITE_LIMIT:
+        return Response({"detail": f"Cannot invite more than {BULK_INVITE_LIMIT} users at once."}, status=status.HTTP_400_BAD_REQUEST)
+
+    organization = request.organization
+    users = {user.username: user for user in User.objects.filter(username__in=set(usernames))}
+    member_ids = set(
+        Membership.objects.filter(organization=organization, user__in=users.values()).values_list('user_id', flat=True)
+    )
+    candidates = [user for user in users.values() if user.id not in member_ids]
+
+    with transaction.atomic():
+        memberships = [Membership(user=user, organization=organization, role=Membership.PENDING) for user in candidates]
+        Membership.objects.bulk_create(memberships, ignore_conflicts=True)
+        # Conflicts are memberships created concurrently, which keep their own joined_at:
+        # only the rows inserted here carry the one bulk_create() set, they alone are invited
+        joined_at = {membership.user_id: membership.joined_at for membership in memberships}
+        created_ids = {
+            user_id for user_id, stored_joined_at in Membership.objects.filter(
+                organization=organization, user_id__in=joined_at
+            ).values_list('user_id', 'joined_at') if stored_joined_at == joined_at[user_id]
+        }
+        invited = [user for user in candidates if user.id in created_ids]
+        member_ids.update(user.id for user in candidates if user.id not in created_ids)
+        if invited:
+            bump_revision(Organization, organization.id)  # bulk_create() sends no signals
+        send_emails(
+            'organization-invitation',
+            f'The {organization.display_name} organization has invited you to join - UNICA',
+            [user.email for user in invited if user.email],
+            {
+                'org_name': organization.display_name,
+                'invitation_link': request.build_absolute_uri(f'/organizations/{organization.id}/invitation')
+            }
+        )
+
+    return Response({
+        'invited': [user.username for user in invited],
+        'already_members': [user.username for user in users.values() if user.id in member_ids],
+        'not_found': [name for name in dict.fromkeys(usernames) if name not in users],
+    }, status=status.HTTP_201_CREATED)
+
+
 @swagger_auto_schema(
     method='post',
     request_body=QueryOptions.to_openapi_schema(
@@ -391,9 +486,10 @@ def list_organization_invitations(request, id):
     result = QueryExecutor(
         base_query,
         options=QueryOptions.build_from_request(request),
-        supported_steps=[QuerySteps.PAGINATION]
+        supported_steps=[QuerySteps.PAGINATION],
+        values=MembershipValuesSerializer.lookups()
     ).execute().paginated_serialize(
-        MembershipSerializer
+        MembershipValuesSerializer
     )
 
     return Response(result, status=status.HTTP_200_OK)
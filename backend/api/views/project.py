@@ -9,10 +9,12 @@ from drf_yasg import openapi
 from django.contrib.contenttypes.models import ContentType
 from django.contrib.auth import get_user_model
 from db.models.organization import Organization
-from api.decorators.organization import organization_permission_classes
+from api.decorators.organization import check_organization_permission
 from db.models.project import Project
-from api.serializers.project import ProjectSerializer, ProjectCreationSerializer
+from api.serializers.project import ProjectSerializer, ProjectCreationSerializer, ProjectValuesSerializer
 from api.decorators.project import project_basic_permission_required
+from api.decorators.etag import etag_condition
+from utils.permission import get_membership
 from utils.query import QuerySteps, QueryExecutor, QueryOptions
 
 User = get_user_model()
@@ -46,21 +48,13 @@ def create_project(request):
     description = request.data.get('description')
     org_id = request.data.get('org_id')
 
-    def _get_owner_info():
-        if org_id:
-            @organization_permission_classes(['Owner', 'Member'])
-            def __internal_func(request, id):
-                return ContentType.objects.get_for_model(Organization), id
-            
-            return __internal_func(request, id = org_id)
-        else:
-            return ContentType.objects.get_for_model(User), request.user.id
-
-    owner_info = _get_owner_info()
-    if isinstance(owner_info, Response):  # return 403 or 404 response from @organization_permission_classes
-        return owner_info
-
-    owner_type, owner_id = owner_info
+    if org_id:
+        error = check_organization_permission(request, org_id, ['Owner', 'Member'])
+        if error is not None:  # return 403 or 404 response
+            return error
+        owner_type, owner_id = ContentType.objects.get_for_model(Organization), org_id
+    else:
+        owner_type, owner_id = ContentType.objects.get_for_model(User), request.user.id
 
     serializer = ProjectCreationSerializer(data={
         'display_name': display_name,
@@ -97,33 +91,36 @@ def list_projects(request):
     org_id = request.data.get('org_id')
 
     if org_id:
-        @organization_permission_classes(['Owner', 'Member'])
-        def __internal_func():
-            return Project.objects.filter(owner_type=ContentType.objects.get_for_model(Organization), owner_id=org_id).order_by('-updated_at')
-        
-        projects = __internal_func()
+        error = check_organization_permission(request, org_id, ['Owner', 'Member'])
+        if error is not None:  # return 403 or 404 response
+            return error
+        projects = Project.objects.filter(owner_type=ContentType.objects.get_for_model(Organization), owner_id=org_id).order_by('-updated_at')
     else:
         projects = Project.objects.filter(owner_type=ContentType.objects.get_for_model(User), owner_id=request.user.id).order_by('-updated_at')
 
-    if isinstance(projects, Response):  # return 403 or 404 response from @organization_permission_classes
-        return projects
-
     result = QueryExecutor(
         projects,
         options=QueryOptions.build_from_request(request),
-        supported_steps=[QuerySteps.PAGINATION]
+        supported_steps=[QuerySteps.PAGINATION],
+        values=ProjectValuesSerializer.lookups()
     ).execute().paginated_serialize(
-        ProjectSerializer
+        ProjectValuesSerializer
     )
 
     return Response(result, status=status.HTTP_200_OK)
 
 
+def _project_info_version(request, id):
+    project = request.project
+    organization = get_membership(request, project.owner_id).organization if project.is_organization_project() else None
+    return request.user.id, project.pk, project.updated_at, organization and organization.updated_at
+
 
 @swagger_auto_schema(
     method='get',
     responses={
         200: openapi.Response(description="Successfully get project basic info", schema=ProjectSerializer()),
+        304: openapi.Response(description="Not modified since the ETag in If-None-Match"),
         404: openapi.Response(description="Project not found"),
         403: openapi.Response(description="Authenticated user does not have permission of this project"),
     },
@@ -134,6 +131,7 @@ def list_projects(request):
 @authentication_classes([SessionAuthentication])
 @permission_classes([IsAuthenticated])
 @project_basic_permission_required
+@etag_condition(_project_info_version)
 def get_project_info(request, id):
     project = request.project
     serializer = ProjectSerializer(project)
@@ -2,15 +2,25 @@ from rest_framework.decorators import api_view, authentication_classes, permissi
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
 from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from datetime import timedelta
 from django.db import transaction
+from django.db.models import Max
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 from rest_framework.authentication import SessionAuthentication
 from rest_framework.permissions import IsAuthenticated
-from db.models.task import TaskCollection, Task
-from api.serializers.task import TaskCollectionSerializer, TaskSerializer
+from db.models.sequence import LocalIdSequence
+from db.models.task import TaskCollection, Task, TaskPropertyValue
+from api.serializers.task import TaskCollectionSerializer, TaskSerializer, TaskValuesSerializer
 from api.decorators.project import project_basic_permission_required
+from utils.activity import record_project_activity
+from utils.query import QuerySteps, QueryExecutor, QueryOptions, CountMode, CursorPagination
+from utils.search import index_instances, remove_instances
+from utils.events import publish_task_events
+from utils.properties import schedule_property_cleanup, filter_tasks_by_properties, PROPERTY_PREFIX
 
 
 @swagger_auto_schema(
@@ -34,28 +44,112 @@ from api.decorators.project import project_basic_permission_required
 def create_task(request, id):
     collection = get_object_or_404(TaskCollection, project=request.project)
 
-    serializer = TaskSerializer(data=request.data, partial=True)
+    serializer = TaskSerializer(data=request.data, partial=True, context={'collection': collection})
     if serializer.is_valid():
         serializer.save(collection=collection)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+BULK_CREATE_LIMIT = 2000
+
+
 @swagger_auto_schema(
     method='post',
     request_body=openapi.Schema(
         type=openapi.TYPE_OBJECT,
-        required=[]
+        properties={
+            'tasks': openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Schema(type=openapi.TYPE_OBJECT),
+                                    description=f'Tasks to create, at most {BULK_CREATE_LIMIT}')
+        },
+        required=['tasks']
+    ),
+    responses={
+        201: openapi.Response(
+            description="Tasks created successfully",
+            schema=TaskSerializer(many=True)
+        ),
+        400: openapi.Response(description="Invalid input"),
+        403: openapi.Response(description="Authenticated user does not have the required permissions"),
+        404: openapi.Response(description="Project or task collection not found"),
+    },
+    operation_description="Create multiple tasks in a single transaction, with contiguous local_ids.",
+    tags=["Project/Task"]
+)
+@api_view(['POST'])
+@authentication_classes([SessionAuthentication])
+@permission_classes([IsAuthenticated])
+@project_basic_permission_required
+def bulk_create_tasks(request, id):
+    collection = get_object_or_404(TaskCollection, project=request.project)
+    tasks_data = request.data.get('tasks')
+
+    if not tasks_data or not isinstance(tasks_data, list):
+        return Response({'detail': 'Invalid tasks. Must be a non-empty list.'}, status=status.HTTP_400_BAD_REQUEST)
+    if len(tasks_data) > BULK_CREATE_LIMIT:
+        return Response({'detail': f'Cannot create more than {BULK_CREATE_LIMIT} tasks at once.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    serializer = TaskSerializer(data=tasks_data, many=True, partial=True, context={'collection': collection})
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    with transaction.atomic():
+        first_local_id = LocalIdSequence.reserve(
+            collection, 
+            count=len(serializer.validated_data),
+            seed=lambda: collection.tasks.aggregate(Max('local_id'))['local_id__max']
+        )
+        tasks = Task.objects.bulk_create([
+            Task(collection=collection, local_id=first_local_id + index, **data)
+            for index, data in enumerate(serializer.validated_data)
+        ], batch_size=500)
+        TaskPropertyValue.index_tasks(collection, tasks)
+        record_project_activity(request.project.pk)
+        index_instances(Task, tasks)  # bulk_create() sends no signals
+        publish_task_events(collection.id, 'created', [task.local_id for task in tasks])
+
+    return Response(TaskSerializer(tasks, many=True, context={'collection': collection}).data,
+                    status=status.HTTP_201_CREATED)
+
+
+LIST_PAGE_SIZE = 100
+# filters and ordering of list_tasks on task fields, next to the global properties
+LIST_FILTER_LOOKUPS = {
+    'local_id': ['exact', 'in', 'gt', 'gte', 'lt', 'lte'],
+    'title': ['exact', 'icontains', 'startswith'],
+    'created_at': ['gt', 'gte', 'lt', 'lte'],
+    'updated_at': ['gt', 'gte', 'lt', 'lte'],
+}
+LIST_ORDERING_FIELDS = ['local_id', 'title', 'created_at', 'updated_at']
+
+
+@swagger_auto_schema(
+    method='post',
+    request_body=QueryOptions.to_openapi_schema(
+        [QuerySteps.FILTERS, QuerySteps.ORDER_BY, QuerySteps.PAGINATION, QuerySteps.CURSOR],
+        extra_schemas={
+            'fields': openapi.Schema(
+                type=openapi.TYPE_ARRAY, items=openapi.Schema(type=openapi.TYPE_STRING),
+                description=f"Task fields to return, e.g. ['local_id', 'title', 'global_properties'], "
+                            f"any of {TaskSerializer.Meta.fields}. All of them by default"
+            )
+        }
     ),
     responses={
         200: openapi.Response(
-            description="List of all tasks retrieved successfully",
+            description="Tasks retrieved successfully, a page of them (count, has_next, next_cursor, results) "
+                        "when 'page' or 'cursor' is given, otherwise all of them",
             schema=TaskSerializer(many=True)
         ),
+        400: openapi.Response(description="Invalid fields, filters or ordering"),
         403: openapi.Response(description="Authenticated user does not have the required permissions"),
         404: openapi.Response(description="Project or task collection not found")
     },
-    operation_description="Retrieve a non-paginated list of all tasks",
+    operation_description="Retrieve the tasks of the board, paginated with 'page' or 'cursor'. "
+                          f"Filters on task fields: {LIST_FILTER_LOOKUPS}, ordering by {LIST_ORDERING_FIELDS}. "
+                          "Global properties are filtered with 'properties.<name>[__<lookup>]' keys, e.g. "
+                          "{'properties.Status__in': [1, 2], 'properties.Estimate__gte': 3}, and sorted with "
+                          "e.g. order_by='-properties.Estimate' (not supported with 'cursor').",
     tags=["Project/Task"]
 )
 @api_view(['POST'])
@@ -64,12 +158,167 @@ def create_task(request, id):
 @project_basic_permission_required
 def list_tasks(request, id):
     collection = get_object_or_404(TaskCollection, project=request.project)
-    tasks = collection.tasks.filter(deleted=False, archived=False).order_by('-updated_at')
-    serializer = TaskSerializer(tasks, many=True)
+    fields = request.data.get('fields')
+    if fields is not None and (not isinstance(fields, list) or not fields
+                               or not set(fields) <= set(TaskSerializer.Meta.fields)):
+        return Response({'detail': f'Invalid fields. Must be a non-empty list of {TaskSerializer.Meta.fields}.'},
+                        status=status.HTTP_400_BAD_REQUEST)
+    paginated = request.data.get('page') is not None or request.data.get('cursor') is not None
+    defaults = {'page_size': LIST_PAGE_SIZE}
+    if not paginated:
+        defaults['count'] = CountMode.NONE.value  # the whole list is returned, nothing to count
+    options = QueryOptions.build_from_request(request, defaults=defaults)
+    if options.cursor is not None and isinstance(options.order_by, str) \
+            and options.order_by.lstrip('-').startswith(PROPERTY_PREFIX):
+        return Response({'detail': 'Cursor pagination does not support ordering by property.'},
+                        status=status.HTTP_400_BAD_REQUEST)
 
+    base_query = filter_tasks_by_properties(
+        collection.tasks.filter(deleted=False, archived=False).order_by('-updated_at'), collection, options
+    )
+    options.restrict(LIST_FILTER_LOOKUPS, LIST_ORDERING_FIELDS)  # the remaining ones, on task fields
+    result = QueryExecutor(
+        base_query,
+        options=options,
+        supported_steps=[QuerySteps.FILTERS, QuerySteps.ORDER_BY, QuerySteps.PAGINATION, QuerySteps.CURSOR],
+        values=TaskValuesSerializer.lookups(fields)
+    ).execute()
+
+    context = {'collection': collection}
+    if paginated:
+        return Response(result.paginated_serialize(TaskValuesSerializer, fields=fields, context=context),
+                        status=status.HTTP_200_OK)
+    serializer = TaskValuesSerializer(result.queryset, many=True, fields=fields, context=context)
     return Response(serializer.data, status=status.HTTP_200_OK)
 
 
+@swagger_auto_schema(
+    method='post',
+    request_body=QueryOptions.to_openapi_schema(
+        [QuerySteps.SEARCH, QuerySteps.FILTERS, QuerySteps.PAGINATION, QuerySteps.CURSOR]
+    ),
+    responses={
+        200: openapi.Response(
+            description="Tasks matching the search term, ordered by relevance",
+            schema=TaskSerializer(many=True)
+        ),
+        400: openapi.Response(description="Search term is required"),
+        403: openapi.Response(description="Authenticated user does not have the required permissions"),
+        404: openapi.Response(description="Project or task collection not found")
+    },
+    operation_description="Search the tasks of the board by title and description, including archived tasks.",
+    tags=["Project/Task"]
+)
+@api_view(['POST'])
+@authentication_classes([SessionAuthentication])
+@permission_classes([IsAuthenticated])
+@project_basic_permission_required
+def search_tasks(request, id):
+    collection = get_object_or_404(TaskCollection, project=request.project)
+    options = QueryOptions.build_from_request(request)
+    if not options.search:
+        return Response({'detail': 'Search term is required.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    base_query = collection.tasks.filter(deleted=False).order_by('-updated_at')
+    result = QueryExecutor(
+        base_query,
+        options=options,
+        supported_steps=[QuerySteps.SEARCH, QuerySteps.FILTERS, QuerySteps.PAGINATION, QuerySteps.CURSOR]
+    ).execute(
+        search_fields=['title', 'description']
+    ).paginated_serialize(
+        TaskSerializer, context={'collection': collection}
+    )
+
+    return Response(result, status=status.HTTP_200_OK)
+
+
+SYNC_PAGE_SIZE = 500
+# Tasks stamped just before `now` may belong to transactions that are not committed yet,
+# the returned watermark never passes this window so that they are picked up by the next sync.
+# Known limit: `updated_at` is stamped when a row is written, not when it commits, so a transaction
+# committing more than this window after its writes can fall behind a watermark and be missed
+# until the task changes again, or the client does a full sync.
+SYNC_SAFETY_WINDOW = timedelta(seconds=5)
+
+
+@swagger_auto_schema(
+    method='post',
+    request_body=openapi.Schema(
+        type=openapi.TYPE_OBJECT,
+        properties={
+            'watermark': openapi.Schema(type=openapi.TYPE_STRING,
+                                        description="The 'watermark' of the previous sync, omit it for a full sync")
+        },
+    ),
+    responses={
+        200: openapi.Response(
+            description="Tasks changed since the watermark",
+            schema=openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                properties={
+                    'tasks': openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Schema(type=openapi.TYPE_OBJECT),
+                                            description="Created or updated tasks on the board"),
+                    'tombstones': openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Schema(type=openapi.TYPE_OBJECT),
+                                                 description="Tasks deleted or archived, to be removed from the board"),
+                    'watermark': openapi.Schema(type=openapi.TYPE_STRING),
+                    'has_more': openapi.Schema(type=openapi.TYPE_BOOLEAN,
+                                               description="Sync again with the new watermark to get the remaining changes"),
+                }
+            )
+        ),
+        400: openapi.Response(description="Invalid watermark"),
+        403: openapi.Response(description="Authenticated user does not have the required permissions"),
+        404: openapi.Response(description="Project or task collection not found")
+    },
+    operation_description="Retrieve the changes of the board since a previous sync. "
+                          "Changes may be returned more than once, they should be applied idempotently. "
+                          f"Known limit: a change committed more than {SYNC_SAFETY_WINDOW.seconds} seconds after "
+                          "it was written may be missed, until the task changes again or the client syncs "
+                          "without a watermark.",
+    tags=["Project/Task"]
+)
+@api_view(['POST'])
+@authentication_classes([SessionAuthentication])
+@permission_classes([IsAuthenticated])
+@project_basic_permission_required
+def sync_tasks(request, id):
+    collection = get_object_or_404(TaskCollection, project=request.project)
+    watermark = request.data.get('watermark') or None
+    now = timezone.now()
+
+    queryset = collection.tasks.order_by('updated_at', 'id')
+    if not watermark:
+        # nothing to remove from an empty board
+        queryset = queryset.filter(deleted=False, archived=False)
+    paginator = CursorPagination()
+    try:
+        rows, next_cursor = paginator.paginate_queryset(
+            queryset, QueryOptions(cursor=watermark, page_size=SYNC_PAGE_SIZE)
+        )
+    except ValidationError:
+        return Response({'detail': 'Invalid watermark.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    if next_cursor:
+        watermark = next_cursor
+    elif rows and rows[-1].updated_at < now - SYNC_SAFETY_WINDOW:
+        watermark = paginator.get_cursor(queryset, rows[-1])
+    elif rows or not watermark:
+        watermark = paginator.get_cursor(queryset, Task(updated_at=now - SYNC_SAFETY_WINDOW, id=0))
+
+    tasks = [task for task in rows if not (task.deleted or task.archived)]
+    tombstones = [
+        {'id': task.id, 'local_id': task.local_id, 'deleted': task.deleted, 'archived': task.archived}
+        for task in rows if task.deleted or task.archived
+    ]
+    return Response({
+        'tasks': TaskSerializer(tasks, many=True, context={'collection': collection}).data,
+        'tombstones': tombstones,
+        'watermark': watermark,
+        'has_more': next_cursor is not None,
+    }, status=status.HTTP_200_OK)
+
+
 @swagger_auto_schema(
     method='patch',
     responses={
@@ -102,7 +351,7 @@ def update_task(request, id):
     except Task.DoesNotExist:
         return Response({'detail': 'No task found.'}, status=status.HTTP_404_NOT_FOUND)
 
-    serializer = TaskSerializer(task, data=updated_value, partial=True) 
+    serializer = TaskSerializer(task, data=updated_value, partial=True, context={'collection': collection})
     if serializer.is_valid():
         serializer.save()
         return Response(serializer.data, status=status.HTTP_201_CREATED)
@@ -185,6 +434,38 @@ def unpin_task(request, id):
     return Response(status=status.HTTP_204_NO_CONTENT)
 
 
+def _update_tasks_by_batch(request, exclude: dict, **values) -> Response:
+    """
+    Apply `values` to the tasks listed in request.data['local_ids'] with a single UPDATE,
+    skipping deleted tasks and those matching `exclude` (already in the target state).
+    Responds with the local_ids of the affected tasks.
+    """
+    collection = get_object_or_404(TaskCollection, project=request.project)
+    local_ids = request.data.get('local_ids')
+
+    if not local_ids or not isinstance(local_ids, list):
+        return Response({'detail': 'Invalid local_ids. Must be a list of integers.'}, status=status.HTTP_400_BAD_REQUEST)
+    if not all(isinstance(local_id, int) for local_id in local_ids):
+        return Response({'detail': 'All local_ids must be integers.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    with transaction.atomic():
+        tasks = collection.tasks.filter(local_id__in=local_ids, deleted=False).exclude(**exclude)
+        affected = list(tasks.select_for_update().order_by('local_id').values_list('pk', 'local_id'))
+        if not affected:
+            return Response({'detail': 'No tasks found or tasks are already in the requested state.'}, status=status.HTTP_404_NOT_FOUND)
+        affected_pks, affected_local_ids = [pk for pk, _ in affected], [local_id for _, local_id in affected]
+
+        now = timezone.now()
+        Task.objects.filter(pk__in=affected_pks).update(updated_at=now, **values)
+        record_project_activity(request.project.pk, now)
+        if values.get('deleted'):
+            remove_instances(Task, affected_pks)  # QuerySet.update() sends no signals
+        action = 'deleted' if values.get('deleted') else 'archived' if values.get('archived') else 'updated'
+        publish_task_events(collection.id, action, affected_local_ids)
+
+    return Response({'local_ids': affected_local_ids}, status=status.HTTP_200_OK)
+
+
 @swagger_auto_schema(
     method='post',
     request_body=openapi.Schema(
@@ -196,9 +477,9 @@ def unpin_task(request, id):
         required=['local_ids']
     ),
     responses={
-        204: openapi.Response(description="Tasks deleted successfully"),
+        200: openapi.Response(description="Tasks deleted successfully, returns the local_ids of deleted tasks"),
         403: openapi.Response(description="Authenticated user does not have the required permissions"),
-        404: openapi.Response(description="Project or task collection not found"),
+        404: openapi.Response(description="Project or task collection not found, or tasks are already deleted"),
         400: openapi.Response(description="Invalid input"),
     },
     operation_description="Batch delete tasks by local_id.",
@@ -209,22 +490,39 @@ def unpin_task(request, id):
 @permission_classes([IsAuthenticated])
 @project_basic_permission_required
 def delete_tasks_by_batch(request, id):
-    collection = get_object_or_404(TaskCollection, project=request.project)
-    local_ids = request.data.get('local_ids')
+    return _update_tasks_by_batch(request, exclude={}, deleted=True)
 
-    if not local_ids or not isinstance(local_ids, list):
-        return Response({'detail': 'Invalid local_ids. Must be a list of integers.'}, status=status.HTTP_400_BAD_REQUEST)
-    if not all(isinstance(local_id, int) for local_id in local_ids):
-        return Response({'detail': 'All local_ids must be integers.'}, status=status.HTTP_400_BAD_REQUEST)
 
-    tasks = collection.tasks.filter(local_id__in=local_ids, deleted=False)
-    if not tasks.exists():
-        return Response({'detail': 'No tasks found or tasks are already deleted.'}, status=status.HTTP_404_NOT_FOUND)
-
-    for task in tasks:
-        task.delete()
-
-    return Response(status=status.HTTP_204_NO_CONTENT)
+@swagger_auto_schema(
+    method='post',
+    request_body=openapi.Schema(
+        type=openapi.TYPE_OBJECT,
+        properties={
+            'local_ids': openapi.Schema(type=openapi.TYPE_ARRAY, 
+                                        items=openapi.Items(type=openapi.TYPE_INTEGER)),
+            'archived': openapi.Schema(type=openapi.TYPE_BOOLEAN, default=True,
+                                       description='True to archive the tasks, False to unarchive them')
+        },
+        required=['local_ids']
+    ),
+    responses={
+        200: openapi.Response(description="Tasks archived or unarchived successfully, returns the local_ids of affected tasks"),
+        403: openapi.Response(description="Authenticated user does not have the required permissions"),
+        404: openapi.Response(description="Project or task collection not found, or tasks are already in the requested state"),
+        400: openapi.Response(description="Invalid input"),
+    },
+    operation_description="Batch archive or unarchive tasks by local_id.",
+    tags=["Project/Task"]
+)
+@api_view(['POST'])
+@authentication_classes([SessionAuthentication])
+@permission_classes([IsAuthenticated])
+@project_basic_permission_required
+def archive_tasks_by_batch(request, id):
+    archived = request.data.get('archived', True)
+    if not isinstance(archived, bool):
+        return Response({'detail': 'archived must be a boolean.'}, status=status.HTTP_400_BAD_REQUEST)
+    return _update_tasks_by_batch(request, exclude={'archived': archived}, archived=archived)
 
 
 @swagger_auto_schema(
@@ -291,6 +589,6 @@ def remove_global_property(request, id):
     if not property_name:
         return Response({'error': 'Property name is required.'}, status=status.HTTP_400_BAD_REQUEST)
     collection.remove_global_property(property_name)
-    # TODO: clear the property values from all tasks
+    schedule_property_cleanup(collection.pk)
     serializer = TaskCollectionSerializer(collection)
     return Response(serializer.data)
\ No newline at end of file
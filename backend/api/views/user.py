@@ -1,6 +1,7 @@
-from django.core.files.base import ContentFile
+from django.conf import settings
 from rest_framework.decorators import api_view, authentication_classes, permission_classes
 from rest_framework.views import APIView
+from django.utils.decorators import method_decorator
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
@@ -9,9 +10,13 @@ from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 from api.serializers.task import TaskSerializer
 from api.serializers.user import UserProfileSerializer
+from api.decorators.etag import etag_condition
 from files.serializers import UserFileSerializer, UserFileSerializerConfig
-from PIL import Image
-from io import BytesIO
+
+
+def _user_profile_version(request):
+    user = request.user
+    return user.id, user.username, user.display_name, user.biography, user.email
 
 
 class UserProfileAPIView(APIView):
@@ -24,10 +29,12 @@ class UserProfileAPIView(APIView):
             200: openapi.Response(
                 description="Successfully get user information", 
                 schema=UserProfileSerializer
-            )
+            ),
+            304: openapi.Response(description="Not modified since the ETag in If-None-Match")
         },
         tags=["User"]
     )
+    @method_decorator(etag_condition(_user_profile_version))
     def get(self, request):
         user = request.user
         serializer = UserProfileSerializer(user)
@@ -64,7 +71,8 @@ class UserProfileAPIView(APIView):
         required=['file']
     ),
     responses={
-        201: openapi.Response(description="Image successfully uploaded"),
+        201: openapi.Response(description="Image successfully uploaded, with the URLs of its resized "
+                                          "variants ('variants'), immutable once stored"),
         400: openapi.Response(description="Invalid data provided"),
     },
     operation_description="Upload an avatar for the authenticated user",
@@ -80,20 +88,13 @@ def upload_user_avatar(request):
     if not file:
         return Response({"error": "No file provided"}, status=status.HTTP_400_BAD_REQUEST)
 
-    def _preprocess_image(uploaded_file):
-        image = Image.open(uploaded_file)
-        image_io = BytesIO()
-        image.save(image_io, format='PNG')
-        image_io.seek(0)
-        return ContentFile(image_io.read(), name=uploaded_file.name.replace(uploaded_file.name.split('.')[-1], 'png'))
-
     cfg = UserFileSerializerConfig(
         target_dir='avatar/',
         max_size=5 * 1024 * 1024,  # 5 MB
-        allowed_types=['image/jpeg', 'image/png'],
+        allowed_types=['image/jpeg', 'image/png', 'image/webp'],
         target_name = f"{request.user.username}",
         strict_check=True,
-        preprocess=_preprocess_image
+        image_sizes=settings.AVATAR_SIZES
     )
 
     serializer = UserFileSerializer(data={'file': file, 'user': request.user.id}, cfg=cfg)
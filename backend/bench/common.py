@@ -0,0 +1,81 @@
+"""
+Setup shared by the benchmarks, which run against a throwaway test database:
+
+    cd backend && python bench/<benchmark>.py
+"""
+import os
+import sys
+import time
+from typing import Callable
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def setup_django():
+    """ Configure Django like manage.py and create the test database, with the migrations of the working tree """
+    import dotenv
+    dotenv.load_dotenv(os.path.join(os.path.dirname(BACKEND_DIR), '.env'))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'unica.settings')
+    sys.path.insert(0, BACKEND_DIR)
+
+    import django
+    django.setup()
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+    setup_test_environment()
+    connection.creation.create_test_db(verbosity=0)
+
+
+def best_time(func: Callable, repeat: int = 5) -> float:
+    """ The shortest of `repeat` runs of `func`, in seconds """
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def create_board(rows: int):
+    """
+    An organization whose owner has a project with `rows` tasks, and a discussion topic with `rows` comments
+    from as many members.
+
+    :return: The (owner, organization, project, topic) created.
+    """
+    from django.contrib.auth import get_user_model
+    from django.contrib.contenttypes.models import ContentType
+    from rest_framework.test import APIClient
+    from db.models.discussion import DiscussionTopic, DiscussionComment
+    from db.models.organization import Organization, Membership
+    from db.models.project import Project
+
+    User = get_user_model()
+    owner = User.objects.create(username='owner', display_name='Owner')
+    members = User.objects.bulk_create([
+        User(username=f'user{i}', email=f'user{i}@example.com', display_name=f'User {i}') for i in range(rows)
+    ])
+    organization = Organization.objects.create(display_name='Organization')
+    Membership.objects.create(user=owner, organization=organization, role=Membership.OWNER)
+    Membership.objects.bulk_create([Membership(user=user, organization=organization) for user in members])
+    project = Project.objects.create(display_name='Project', owner_id=organization.id,
+                                     owner_type=ContentType.objects.get_for_model(Organization))
+
+    client = APIClient()
+    client.force_authenticate(owner)
+    client.post(f'/api/organization/{organization.id}/discussion/enable/')
+    client.post(f'/api/organization/{organization.id}/discussion/topic/create/',
+                {'title': 'Topic', 'comment': {'content': 'First'}}, format='json')
+    topic = DiscussionTopic.objects.get()
+    DiscussionComment.objects.bulk_create([
+        DiscussionComment(topic=topic, user=user, local_id=i + 2, content='A comment on the topic. ' * 5)
+        for i, user in enumerate(members)
+    ])
+    client.patch(f'/api/project/{project.id}/task/g-prop/update/', {'type': 'number', 'name': 'Estimate'},
+                 format='json')
+    tasks = [{'title': f'Task {i}', 'description': 'A description of the task. ' * 5,
+              'global_properties': {'Estimate': i / 4}} for i in range(rows)]
+    for start in range(0, rows, 1000):
+        client.post(f'/api/project/{project.id}/task/bulk-create/', {'tasks': tasks[start:start + 1000]},
+                    format='json')
+    return owner, organization, project, topic
@@ -0,0 +1,46 @@
+"""
+CPU cost against bytes saved of each content coding of CompressionMiddleware, on `list_tasks` and
+`list_comment` responses of increasing sizes:
+
+    cd backend && python bench/compression.py --rows 10 100 1000 5000
+"""
+import argparse
+from common import best_time, create_board, setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[10, 100, 1000, 5000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    setup_django()
+
+    from rest_framework.test import APIClient
+    from api.middleware import _get_compressors
+
+    compressors = _get_compressors()
+    owner, organization, project, _ = create_board(max(args.rows))
+    client = APIClient()
+    client.force_authenticate(owner)
+    endpoints = [
+        ('list_tasks', f'/api/project/{project.id}/task/list/', {}),
+        ('list_comment', f'/api/organization/{organization.id}/discussion/comment/list/', {'topic_local_id': 1}),
+    ]
+
+    # Compressing pays off on links slower than the break-even speed, the bytes saved per second of CPU
+    print(f"{'endpoint':<14}{'rows':>6}{'bytes':>10}  {'coding':<6}{'bytes':>9}{'ratio':>8}{'CPU ms':>9}"
+          f"{'saved KB/CPU ms':>17}{'break-even Mbit/s':>19}")
+    for name, url, data in endpoints:
+        for rows in args.rows:
+            response = client.post(url, {**data, 'page': 1, 'page_size': rows}, format='json')  # uncompressed
+            content = response.content
+            for coding, compress in compressors.items():
+                seconds = best_time(lambda: compress(content), args.repeat)
+                saved = len(content) - len(compress(content))
+                print(f'{name:<14}{rows:>6}{len(content):>10}  {coding:<6}{len(content) - saved:>9}'
+                      f'{(len(content) - saved) / len(content):>8.1%}{seconds * 1000:>9.2f}'
+                      f'{saved / 1024 / (seconds * 1000):>17.1f}{saved * 8 / seconds / 1e6:>19.0f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+"""
+Rows per second of FastJSONRenderer against DRF's JSONRenderer, on `list_tasks` and `list_comment` payloads:
+
+    cd backend && python bench/renderers.py --rows 100 1000 5000
+"""
+import argparse
+from common import best_time, create_board, setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[100, 1000, 5000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    setup_django()
+
+    from rest_framework.renderers import JSONRenderer
+    from rest_framework.test import APIClient
+    from api.renderers import FastJSONRenderer, orjson
+
+    if orjson is None:
+        print('orjson is not installed, FastJSONRenderer is the standard renderer.')
+    owner, organization, project, _ = create_board(max(args.rows))
+    client = APIClient()
+    client.force_authenticate(owner)
+    endpoints = [
+        ('list_tasks', f'/api/project/{project.id}/task/list/', {}),
+        ('list_comment', f'/api/organization/{organization.id}/discussion/comment/list/', {'topic_local_id': 1}),
+    ]
+
+    print(f"{'endpoint':<14}{'rows':>6}{'bytes':>10}{'DRF rows/s':>13}{'fast rows/s':>13}{'speedup':>9}")
+    for name, url, data in endpoints:
+        for rows in args.rows:
+            payload = client.post(url, {**data, 'page': 1, 'page_size': rows}, format='json').data
+            content = JSONRenderer().render(payload)
+            assert FastJSONRenderer().render(payload) == content, f'{name} output differs'
+            drf_time = best_time(lambda: JSONRenderer().render(payload), args.repeat)
+            fast_time = best_time(lambda: FastJSONRenderer().render(payload), args.repeat)
+            print(f'{name:<14}{rows:>6}{len(content):>10}{rows / drf_time:>13.0f}{rows / fast_time:>13.0f}'
+                  f'{drf_time / fast_time:>8.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""
+Rows per second of the values() serializers against their DRF ModelSerializer counterparts,
+the query included, over lists of `--rows` rows:
+
+    cd backend && python bench/serializers.py --rows 2000
+"""
+import argparse
+import json
+from common import best_time, create_board, setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    setup_django()
+
+    from db.models.organization import Membership
+    from db.models.project import Project
+    from db.models.task import TaskCollection
+    from api.serializers.discussion import DiscussionCommentSerializer, DiscussionCommentValuesSerializer
+    from api.serializers.organization import MembershipSerializer, MembershipValuesSerializer
+    from api.serializers.project import ProjectSerializer, ProjectValuesSerializer
+    from api.serializers.task import TaskSerializer, TaskValuesSerializer
+
+    _, organization, project, topic = create_board(args.rows)
+    for i in range(args.rows - 1):  # saved one by one, for their hash ids and task collections
+        Project.objects.create(display_name=f'Project {i}', owner_type=project.owner_type, owner_id=project.owner_id)
+    collection = TaskCollection.objects.get(project=project)
+    cases = [
+        (TaskSerializer, TaskValuesSerializer, collection.tasks.order_by('-updated_at'), {'collection': collection}),
+        (MembershipSerializer, MembershipValuesSerializer,
+         Membership.objects.filter(organization=organization).order_by('-joined_at'), {}),
+        (DiscussionCommentSerializer, DiscussionCommentValuesSerializer, topic.comments.order_by('created_at'), {}),
+        (ProjectSerializer, ProjectValuesSerializer, Project.objects.order_by('-updated_at'), {}),
+    ]
+
+    print(f"{'serializer':<36}{'rows':>7}{'DRF rows/s':>13}{'values() rows/s':>17}{'speedup':>9}")
+    for model_serializer, values_serializer, queryset, context in cases:
+        def drf():
+            return model_serializer(list(queryset), many=True, context=context).data
+
+        def values():
+            return values_serializer(queryset.values(*values_serializer.lookups()), context=context).data
+
+        rows = len(queryset)
+        assert json.dumps(drf()) == json.dumps(values()), f'{values_serializer.__name__} output differs'
+        drf_time, values_time = best_time(drf, args.repeat), best_time(values, args.repeat)
+        print(f'{values_serializer.__name__:<36}{rows:>7}{rows / drf_time:>13.0f}{rows / values_time:>17.0f}'
+              f'{drf_time / values_time:>8.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from db.models.task import TaskCollection, TaskPropertyValue
+
+CHUNK_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = "Rebuild the index of the global property values of every task, used to filter and sort tasks."
+
+    def handle(self, *args, **options):
+        count = 0
+        for collection in TaskCollection.objects.iterator():
+            tasks = list(collection.tasks.only('pk', 'global_properties').order_by('pk'))
+            for start in range(0, len(tasks), CHUNK_SIZE):
+                TaskPropertyValue.index_tasks(collection, tasks[start:start + CHUNK_SIZE])
+            count += len(tasks)
+        self.stdout.write(self.style.SUCCESS(f"Indexed {count} tasks."))
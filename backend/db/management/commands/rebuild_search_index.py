@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from utils.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search index of discussions and tasks from the database."
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        if backend is None:
+            self.stdout.write("No full-text search backend available, searches use icontains filters.")
+            return
+        backend.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Search index rebuilt with {type(backend).__name__}."))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from db.models.discussion import DiscussionTopic
+
+
+class Command(BaseCommand):
+    help = "Recompute the denormalized author and comment statistics of every discussion topic."
+
+    def handle(self, *args, **options):
+        count = 0
+        for topic in DiscussionTopic.objects.only('pk').iterator():
+            topic.refresh_comment_stats()
+            count += 1
+        self.stdout.write(self.style.SUCCESS(f"Refreshed {count} topics."))
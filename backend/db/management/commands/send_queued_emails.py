@@ -0,0 +1,20 @@
+import time
+from django.core.management.base import BaseCommand
+from utils.mails.outbox import send_queued_emails
+
+
+class Command(BaseCommand):
+    help = "Deliver the due emails of the outbox, once or every --interval seconds."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, default=0, help="Keep running, polling every N seconds.")
+
+    def handle(self, *args, **options):
+        interval = options['interval']
+        while True:
+            sent = send_queued_emails()
+            if sent or not interval:
+                self.stdout.write(f"Sent {sent} emails.")
+            if not interval:
+                return
+            time.sleep(interval)
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from utils.properties import strip_all_stale_properties
+
+
+class Command(BaseCommand):
+    help = "Remove the values of removed global properties from the tasks of every collection."
+
+    def handle(self, *args, **options):
+        count = strip_all_stale_properties()
+        self.stdout.write(self.style.SUCCESS(f"Cleaned up {count} tasks."))
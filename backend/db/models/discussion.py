@@ -1,13 +1,19 @@
 from django.db import models, transaction
+from django.db.models import F
 from django.utils import timezone
 from django.core.exceptions import ValidationError
+from django.contrib.auth import get_user_model
 from db.models.abstract import AbstractComment
 from db.models.organization import Organization
+from db.models.sequence import LocalIdSequence
+
+User = get_user_model()
 
 
 class Discussion(models.Model):
     organization = models.OneToOneField(Organization, on_delete=models.CASCADE, related_name='discussion')
     created_at = models.DateTimeField(auto_now_add=True)
+    revision = models.PositiveIntegerField(default=0, editable=False)  # bumped on changes of categories
 
     def __str__(self):
         return f"Discussions of {self.organization.display_name}"
@@ -35,30 +41,43 @@ class DiscussionTopic(models.Model):
     deleted = models.BooleanField(default=False) # soft delete
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # denormalized from comments, maintained by DiscussionComment.save
+    author = models.ForeignKey(User, on_delete=models.SET_NULL, related_name='+', null=True, blank=True)  # user of the first comment
+    comment_count = models.IntegerField(default=0)  # non-deleted comments
+    last_comment_at = models.DateTimeField(null=True, blank=True)
 
     class Meta:
         unique_together = ('discussion', 'local_id')
+        indexes = [
+            models.Index(fields=['discussion', '-updated_at'], condition=models.Q(deleted=False), name='topic_discussion_updated_idx'),
+        ]
     
     def save(self, *args, **kwargs):
-        if self.category and self.category.discussion != self.discussion:
+        if self.category and self.category.discussion_id != self.discussion_id:
             raise ValidationError("The category does not belong to the same discussion.")
         
         with transaction.atomic():
             if not self.local_id:
-                max_local_id = DiscussionTopic.objects.filter(
-                    discussion=self.discussion
-                ).select_for_update().aggregate(models.Max('local_id'))['local_id__max']
-
-                if max_local_id is not None:
-                    self.local_id = max_local_id + 1 # Generate local_id at max+1
-                else:
-                    self.local_id = 1
+                self.local_id = LocalIdSequence.reserve(
+                    self.discussion,
+                    seed=lambda: DiscussionTopic.objects.filter(discussion=self.discussion).aggregate(models.Max('local_id'))['local_id__max']
+                )
             super().save(*args, **kwargs)
 
     def delete(self):
         self.deleted = True
         self.save()
 
+    def refresh_comment_stats(self):
+        """ Recompute the denormalized comment fields, e.g. for topics created before they existed """
+        comments = self.comments.filter(deleted=False)
+        first_comment = self.comments.order_by('created_at').first()
+        DiscussionTopic.objects.filter(pk=self.pk).update(
+            author=first_comment.user_id if first_comment else None,
+            comment_count=comments.count(),
+            last_comment_at=comments.aggregate(models.Max('created_at'))['created_at__max']
+        )
+
     def __str__(self):
         return self.title
     
@@ -69,23 +88,43 @@ class DiscussionComment(AbstractComment):
     edited = models.BooleanField(default=False)
     deleted = models.BooleanField(default=False) # soft delete
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['topic', 'created_at'], condition=models.Q(deleted=False), name='comment_topic_created_idx'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._stored_deleted = instance.__dict__.get('deleted')  # to detect soft deletion on save
+        return instance
+
     def save(self, *args, **kwargs):
         with transaction.atomic():
             self.edited = True
+            toggled = self.deleted != getattr(self, '_stored_deleted', self.deleted)  # soft deleted or restored
             if not self.local_id:
-                max_local_id = DiscussionComment.objects.filter(
-                    topic=self.topic
-                ).select_for_update().aggregate(models.Max('local_id'))['local_id__max']
-
-                if max_local_id is not None:
-                    self.local_id = max_local_id + 1  # Generate local_id at max+1
-                else:
-                    self.local_id = 1
+                self.local_id = LocalIdSequence.reserve(
+                    self.topic,
+                    seed=lambda: DiscussionComment.objects.filter(topic=self.topic).aggregate(models.Max('local_id'))['local_id__max']
+                )
                 self.edited = False # no local_id regarded as creation(no edited)
 
-                self.topic.updated_at = timezone.now()
-                self.topic.save()
+                now = timezone.now()
+                stats = {'comment_count': F('comment_count') + 1, 'last_comment_at': now, 'updated_at': now}
+                if self.local_id == 1:
+                    stats['author'] = self.user_id
+                DiscussionTopic.objects.filter(pk=self.topic_id).update(**stats)
             super().save(*args, **kwargs)
+            if toggled:
+                # the comment may have been the last one
+                last_comment_at = DiscussionComment.objects.filter(
+                    topic_id=self.topic_id, deleted=False
+                ).aggregate(models.Max('created_at'))['created_at__max']
+                DiscussionTopic.objects.filter(pk=self.topic_id).update(
+                    comment_count=F('comment_count') + (-1 if self.deleted else 1), last_comment_at=last_comment_at
+                )
+            self._stored_deleted = self.deleted
                 
 
     def delete(self):
@@ -0,0 +1,35 @@
+from django.db import models
+
+
+class OutgoingEmail(models.Model):
+    """
+    An email queued for delivery by `utils.mails.outbox`, rendered when it was queued.
+    """
+    PENDING = 'Pending'
+    SENT = 'Sent'
+    FAILED = 'Failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (SENT, 'Sent'),
+        (FAILED, 'Failed'),
+    ]
+
+    subject = models.CharField(max_length=255)
+    from_email = models.CharField(max_length=255, blank=True, null=True)
+    to = models.JSONField(default=list)  # recipients' email addresses
+    text_content = models.TextField()
+    html_content = models.TextField(blank=True, null=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField()  # also pushed forward while an attempt is in progress
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['next_attempt_at'], condition=models.Q(status='Pending'), name='outgoing_email_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.to)} ({self.status})"
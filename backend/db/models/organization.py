@@ -12,6 +12,7 @@ class Organization(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     members = models.ManyToManyField(User, through='Membership', related_name='organizations')
+    revision = models.PositiveIntegerField(default=0, editable=False)  # bumped on changes of members, projects and discussion
 
     def save(self, *args, **kwargs):
         # Generate id if not set
@@ -42,7 +43,6 @@ class Membership(models.Model):
         unique_together = ('user', 'organization')
         indexes = [
             models.Index(fields=['role']),
-            models.Index(fields=['user', 'organization']),
         ]
 
     def __str__(self):
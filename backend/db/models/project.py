@@ -20,14 +20,20 @@ class Project(models.Model):
     owner_id = models.BigIntegerField()
     owner = GenericForeignKey('owner_type', 'owner_id') # it will not auto delete cascadly when owner is deleted!
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['owner_type', 'owner_id', '-updated_at'], name='project_owner_updated_idx'),
+        ]
+
     def save(self, *args, **kwargs):
+        adding = self._state.adding
         # Generate id if not set
         if self.pk is None:
             timestamp = timezone.now().strftime('%Y%m%d%H%M%S%f')
             self.id = mmh3.hash(str(self.display_name + timestamp), signed=False)
         super().save(*args, **kwargs)
         # Automatically create the associated board
-        if not hasattr(self, 'tasks'):
+        if adding:
             from db.models.task import TaskCollection
             TaskCollection.objects.create(project=self)
 
@@ -0,0 +1,47 @@
+from typing import Callable, Optional
+from django.db import models, transaction, IntegrityError
+from django.db.models import F
+
+
+class LocalIdSequence(models.Model):
+    """
+    Per-scope counter of allocated local ids (e.g. tasks in a collection, comments in a topic).
+    Allocation increments a single row instead of aggregating over the whole scope.
+    """
+    scope = models.CharField(max_length=64, unique=True)  # "<app_label>.<model>:<pk>" of the scope owner
+    last_value = models.IntegerField(default=0)
+
+    @staticmethod
+    def scope_of(owner: models.Model) -> str:
+        return f"{owner._meta.label_lower}:{owner.pk}"
+
+    @classmethod
+    def reserve(cls, owner: models.Model, count: int = 1, seed: Optional[Callable[[], Optional[int]]] = None) -> int:
+        """
+        Atomically reserve `count` consecutive local ids in the scope of `owner`.
+
+        :param owner: The model instance the local ids are scoped to.
+        :param count: Number of ids to reserve.
+        :param seed: Returns the largest local id already in use, called only once
+            to initialize the counter of a scope created before sequences existed.
+        :return: The first reserved id, the reserved range is [first, first + count).
+        """
+        if count < 1:
+            raise ValueError("count must be a positive integer")
+
+        scope = cls.scope_of(owner)
+        with transaction.atomic():
+            # The UPDATE takes the row (or database) write lock, serializing concurrent writers
+            if not cls.objects.filter(scope=scope).update(last_value=F('last_value') + count):
+                try:
+                    with transaction.atomic():
+                        initial = (seed() if seed else None) or 0
+                        cls.objects.create(scope=scope, last_value=initial + count)
+                except IntegrityError:
+                    # Created concurrently by another writer
+                    cls.objects.filter(scope=scope).update(last_value=F('last_value') + count)
+            last_value = cls.objects.filter(scope=scope).values_list('last_value', flat=True).get()
+        return last_value - count + 1
+
+    def __str__(self):
+        return f"{self.scope} ({self.last_value})"
@@ -1,35 +1,59 @@
 from django.contrib.auth import get_user_model
-from django.utils import timezone
 from django.db import models, transaction
-from jsonschema import validate, ValidationError as JSONSchemaValidationError
-from api.schemas.task import PROPERTY_SCHEMA
+from jsonschema import ValidationError as JSONSchemaValidationError
+from api.schemas.validators import property_validator
 from db.models.project import Project
 from db.models.abstract import AbstractComment
+from db.models.sequence import LocalIdSequence
+from utils.activity import record_project_activity
 
 User = get_user_model()
 
 class TaskCollection(models.Model):
     project = models.OneToOneField(Project, related_name='tasks', on_delete=models.CASCADE)
     global_properties = models.JSONField(default=list)  # global property definitions
+    revision = models.PositiveIntegerField(default=0, editable=False)  # bumped on changes of the definitions
+    # revision of the last removal of a definition, task values older than it may hold the removed property
+    removal_revision = models.PositiveIntegerField(default=0, editable=False)
+
+    def save(self, *args, **kwargs):
+        if self._state.adding:
+            super().save(*args, **kwargs)
+            return
+        # bumped in SQL, so that concurrent saves never share a revision
+        self.revision = models.F('revision') + 1
+        super().save(*args, **kwargs)
+        self.refresh_from_db(fields=['revision', 'removal_revision'])
+
+    def _lock_global_properties(self):
+        """ Reload the definitions under a row lock, concurrent edits then apply one after the other """
+        self.global_properties = TaskCollection.objects.select_for_update().values_list(
+            'global_properties', flat=True
+        ).get(pk=self.pk)
 
     def add_or_update_global_property(self, new_prop):
         try:
-            validate(instance=new_prop, schema=PROPERTY_SCHEMA)
+            property_validator.validate(new_prop)
         except JSONSchemaValidationError as e:
             raise ValueError(f"Invalid property definition: {e.message}")
-        for prop in self.global_properties:
-            if prop['name'] == new_prop['name']:
-                if prop['type'] != new_prop['type']:
-                    raise ValueError(f"Property already exists with different type")
-                prop.update(new_prop)
-                self.save()
-                return
-        self.global_properties.append(new_prop)
-        self.save()
+        with transaction.atomic():
+            self._lock_global_properties()
+            for prop in self.global_properties:
+                if prop['name'] == new_prop['name']:
+                    if prop['type'] != new_prop['type']:
+                        raise ValueError(f"Property already exists with different type")
+                    prop.update(new_prop)
+                    self.save()
+                    return
+            self.global_properties.append(new_prop)
+            self.save()
 
     def remove_global_property(self, property_name):
-        self.global_properties = [prop for prop in self.global_properties if prop['name'] != property_name]
-        self.save()
+        with transaction.atomic():
+            self._lock_global_properties()
+            self.global_properties = [prop for prop in self.global_properties if prop['name'] != property_name]
+            self.removal_revision = models.F('revision') + 1  # the revision saved below
+            self.save()
 
 
 class Task(models.Model):
@@ -45,24 +69,41 @@ class Task(models.Model):
     pinned_users = models.ManyToManyField(User, related_name='pinned_tasks')
     # dynamic properties
     global_properties = models.JSONField(default=dict)  # global property values
+    # revision of the collection definitions the values were validated against,
+    # values older than its `removal_revision` may hold removed properties until they are cleaned up (see `utils.properties`)
+    properties_revision = models.PositiveIntegerField(default=0, editable=False)
     local_properties = models.JSONField(default=dict)  # local property definitions and values
 
+    class Meta:
+        indexes = [
+            # partial on the soft delete flag, which SQLite cannot use as a leading key (`NOT deleted`)
+            models.Index(fields=['collection', '-updated_at'], condition=models.Q(deleted=False), name='task_collection_updated_idx'),
+            models.Index(fields=['collection', 'updated_at', 'id'], name='task_collection_sync_idx'),  # incl. tombstones
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._stored_properties = instance.__dict__.get('global_properties')
+        return instance
+
     def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        properties_changed = (self._state.adding or getattr(self, '_stored_properties', None) != self.global_properties) \
+            and (update_fields is None or 'global_properties' in update_fields)
         with transaction.atomic():
             if not self.local_id:
-                max_local_id = Task.objects.filter(
-                    collection = self.collection
-                ).select_for_update().aggregate(models.Max('local_id'))['local_id__max']
-                
-                if max_local_id is not None:
-                    self.local_id = max_local_id + 1 # Generate local_id at max+1
-                else:
-                    self.local_id = 1
+                self.local_id = LocalIdSequence.reserve(
+                    self.collection,
+                    seed=lambda: Task.objects.filter(collection=self.collection).aggregate(models.Max('local_id'))['local_id__max']
+                )
             super().save(*args, **kwargs)
+            if properties_changed:
+                TaskPropertyValue.index_tasks(self.collection, [self])
+        self._stored_properties = self.global_properties
 
         # Update the parent project's updated_at field
-        self.collection.project.updated_at = timezone.now()
-        self.collection.project.save()
+        record_project_activity(self.collection.project_id)
 
     def archive(self):
         self.archived = True
@@ -76,5 +117,40 @@ class Task(models.Model):
         return f"#{self.local_id} {self.title}"
     
 
+class TaskPropertyValue(models.Model):
+    """
+    Index of the global property values of tasks, one row per number value or selected label option,
+    kept in sync with `Task.global_properties` to filter and sort tasks in SQL (see `filter_tasks_by_properties`).
+    Values of undefined properties are not indexed.
+    """
+    collection = models.ForeignKey(TaskCollection, related_name='+', on_delete=models.CASCADE)
+    task = models.ForeignKey(Task, related_name='property_values', on_delete=models.CASCADE)
+    name = models.CharField(max_length=100)
+    option_id = models.IntegerField(blank=True, null=True)  # label properties
+    number = models.FloatField(blank=True, null=True)  # number properties
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['collection', 'name', 'option_id'], name='task_property_option_idx'),
+            models.Index(fields=['collection', 'name', 'number'], name='task_property_number_idx'),
+        ]
+
+    @classmethod
+    def index_tasks(cls, collection: TaskCollection, tasks) -> None:
+        """ Replace the index rows of saved tasks, e.g. after a bulk_create() which skips `Task.save` """
+        types = {prop['name']: prop['type'] for prop in collection.global_properties}
+        rows = []
+        for task in tasks:
+            for name, value in task.global_properties.items():
+                if types.get(name) == 'label':
+                    option_ids = value if isinstance(value, list) else [value]
+                    rows += [cls(collection=collection, task=task, name=name, option_id=option_id)
+                             for option_id in option_ids if isinstance(option_id, int)]
+                elif types.get(name) == 'number' and isinstance(value, (int, float)) and not isinstance(value, bool):
+                    rows.append(cls(collection=collection, task=task, name=name, number=value))
+        cls.objects.filter(task__in=[task.pk for task in tasks]).delete()
+        cls.objects.bulk_create(rows, batch_size=500)
+
+
 class TaskComment(AbstractComment):
     task = models.ForeignKey(Task, related_name='comments', on_delete=models.CASCADE)
\ No newline at end of file
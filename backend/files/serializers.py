@@ -1,13 +1,16 @@
 import hashlib
 import time
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from io import BytesIO
 from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
 from django.core.files.uploadedfile import UploadedFile
 from django.core.files.storage import FileSystemStorage
+from PIL import Image, ImageOps, UnidentifiedImageError
 from rest_framework import serializers
-from typing import Optional, List, Callable
+from typing import Optional, List, Callable, Dict
 import os
-from unica.settings import MEDIA_ROOT
+from unica.settings import MEDIA_ROOT, MEDIA_URL
 
 import platform
 if platform.system() == 'Darwin':
@@ -36,6 +39,48 @@ class UserFileSerializerConfig:
     strict_check: Optional[bool] = True
     preprocess: Optional[Callable[[UploadedFile], UploadedFile]] = None
 
+    # image pipeline, when `image_sizes` is set the file is stored as square variants of each size and format,
+    # under `target_dir/<sha256 of the upload>/`, and the largest PNG is also copied to `target_name.png`
+    image_sizes: Optional[List[int]] = None
+    image_formats: List[str] = field(default_factory=lambda: ['webp', 'png'])
+
+
+IMAGE_SAVE_OPTIONS = {
+    'webp': {'format': 'WEBP', 'quality': 85, 'method': 4},
+    'png': {'format': 'PNG', 'optimize': True},
+}
+
+
+def process_image(file: UploadedFile, sizes: List[int], formats: List[str]) -> Dict[str, bytes]:
+    """
+    Downsize an image to squares of each size (center-cropped, never upscaled) and encode them in each format,
+    without the metadata of the original (EXIF, ICC profile, text chunks).
+
+    :return: The encoded variants keyed by file name, e.g. `64.webp`, named after the requested size.
+    :raises serializers.ValidationError: If the file is not a readable image.
+    """
+    try:
+        image = Image.open(file)
+        # JPEG only: decode at a reduced scale, still at least as large as the largest variant
+        image.draft('RGB', (max(sizes), max(sizes)))
+        image = ImageOps.exif_transpose(image)  # apply the orientation before dropping EXIF
+        has_alpha = image.mode in ('RGBA', 'LA', 'PA') or (image.mode == 'P' and 'transparency' in image.info)
+        image = image.convert('RGBA' if has_alpha else 'RGB')
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError):
+        raise serializers.ValidationError({'file': ["File is not a valid image."]})
+    image.info = {}
+
+    variants = {}
+    # from the largest size down, each variant is resampled from the previous (already small) one
+    for size in sorted(sizes, reverse=True):
+        side = min(size, *image.size)
+        image = ImageOps.fit(image, (side, side), method=Image.Resampling.LANCZOS)
+        for image_format in formats:
+            output = BytesIO()
+            image.save(output, **IMAGE_SAVE_OPTIONS[image_format])
+            variants[f'{size}.{image_format}'] = output.getvalue()
+    return variants
+
 
 class UserFileSerializer(serializers.ModelSerializer):
     class Meta:
@@ -68,6 +113,9 @@ class UserFileSerializer(serializers.ModelSerializer):
         if self.cfg.preprocess:
             file = self.cfg.preprocess(file)
 
+        if self.cfg.image_sizes:
+            return self._create_image_variants(user, file)
+
         if self.cfg.target_name:
             file_name = self.cfg.target_name + '.' + file.name.split('.')[-1]
         else:
@@ -83,4 +131,43 @@ class UserFileSerializer(serializers.ModelSerializer):
         user_file = UserFile.objects.create(user=user, file=relative_file_path)
 
 
-        return user_file
\ No newline at end of file
+        return user_file
+
+    def _create_image_variants(self, user, file: UploadedFile) -> UserFile:
+        sha256 = hashlib.sha256()
+        for chunk in file.chunks():
+            sha256.update(chunk)
+        file.seek(0)
+        content_hash = sha256.hexdigest()
+        target_dir = os.path.join(MEDIA_ROOT, self.cfg.target_dir)
+        fs = FileSystemStorage(location=target_dir)
+
+        sizes = sorted(self.cfg.image_sizes, reverse=True)
+        names = [f'{size}.{image_format}' for size in sizes for image_format in self.cfg.image_formats]
+        if not all(fs.exists(os.path.join(content_hash, name)) for name in names):
+            # Variants of identical uploads are stored once, and never change afterwards
+            for name, content in process_image(file, sizes, self.cfg.image_formats).items():
+                if not fs.exists(os.path.join(content_hash, name)):
+                    fs.save(os.path.join(content_hash, name), ContentFile(content))
+        largest_name = f'{sizes[0]}.png' if 'png' in self.cfg.image_formats else names[0]
+        largest = os.path.join(target_dir, content_hash, largest_name)
+
+        if self.cfg.target_name:
+            # stable name, e.g. for clients building the URL from the username
+            file_name = self.cfg.target_name + '.' + largest_name.rsplit('.', 1)[-1]
+            if fs.exists(file_name):
+                fs.delete(file_name)
+            with fs.open(os.path.join(content_hash, largest_name)) as f:
+                fs.save(file_name, ContentFile(f.read()))
+
+        user_file = UserFile.objects.create(user=user, file=largest)
+        user_file.variants = {
+            name: f'{MEDIA_URL}{self.cfg.target_dir}{content_hash}/{name}' for name in names
+        }
+        return user_file
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        if hasattr(instance, 'variants'):
+            data['variants'] = instance.variants
+        return data
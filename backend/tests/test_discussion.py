@@ -0,0 +1,50 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+from db.models.organization import Organization, Membership
+
+User = get_user_model()
+
+
+class ListTopicsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='owner')
+        cls.organization = Organization.objects.create(display_name='Organization')
+        Membership.objects.create(user=cls.user, organization=cls.organization, role=Membership.OWNER)
+        cls.url = f'/api/organization/{cls.organization.id}/discussion/'
+        cache.clear()  # the discussion endpoints are throttled per user
+        client = APIClient()
+        client.force_authenticate(cls.user)
+        client.post(cls.url + 'enable/')
+        for i in range(3):
+            client.post(cls.url + 'topic/create/', {'title': f'Topic {i}', 'comment': {'content': 'First'}},
+                        format='json')
+        for _ in range(2):
+            client.post(cls.url + 'comment/create/', {'topic_local_id': 2, 'content': 'Reply'}, format='json')
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def list_topics(self, data: dict):
+        return self.client.post(self.url + 'topic/list/', {'page': 1, 'page_size': 10, **data}, format='json')
+
+    def test_order_by(self):
+        response = self.list_topics({'order_by': '-comment_count'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([topic['comment_count'] for topic in response.json()['results']], [3, 1, 1])
+
+    def test_filters(self):
+        response = self.list_topics({'filters': {'local_id__in': [1, 3], 'category__isnull': True}})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(sorted(topic['local_id'] for topic in response.json()['results']), [1, 3])
+
+    def test_unsupported_options(self):
+        for data in ({'order_by': 'nope'}, {'order_by': 'author__password'}, {'order_by': ['title']},
+                     {'filters': {'author__password__startswith': 'pbkdf2'}}, {'filters': {'deleted': True}},
+                     {'filters': ['title']}):
+            with self.subTest(data=data):
+                self.assertEqual(self.list_topics(data).status_code, 400)
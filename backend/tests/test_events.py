@@ -0,0 +1,148 @@
+import asyncio
+import threading
+from contextlib import suppress
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIClient
+from db.models.organization import Organization, Membership
+from db.models.project import Project
+from db.models.task import TaskCollection
+from utils.events import EventBroker, InMemoryBroker, task_collection_channel
+
+User = get_user_model()
+
+
+class RecordingBroker(EventBroker):
+    def __init__(self):
+        self.events = []
+
+    def publish(self, channel, event):
+        self.events.append((channel, event))
+
+
+class InMemoryBrokerTest(SimpleTestCase):
+    async def test_fan_out(self):
+        broker = InMemoryBroker()
+        first, second, other = broker.subscribe('a'), broker.subscribe('a'), broker.subscribe('b')
+        thread = threading.Thread(target=broker.publish, args=('a', {'type': 'task.created', 'local_id': 1}))
+        thread.start()
+        thread.join()
+        self.assertEqual(await first.__anext__(), {'type': 'task.created', 'local_id': 1})
+        self.assertEqual(await second.__anext__(), {'type': 'task.created', 'local_id': 1})
+        self.assertTrue(other.queue.empty())
+
+        await first.aclose()
+        await second.aclose()
+        self.assertFalse(broker.has_subscribers('a'))
+        self.assertTrue(broker.has_subscribers('b'))
+
+    async def test_slow_subscriber(self):
+        broker = InMemoryBroker()
+        subscription = broker.subscribe('a')
+        with mock.patch.object(InMemoryBroker, 'max_pending', 2):
+            for local_id in range(5):
+                broker.publish('a', {'type': 'task.updated', 'local_id': local_id})
+            await asyncio.sleep(0)  # run the callbacks scheduled by publish
+        events = [event async for event in subscription]
+        self.assertEqual([event['type'] for event in events], ['task.updated', 'task.updated', 'resync'])
+        self.assertFalse(broker.has_subscribers('a'))
+
+
+class PublishEventsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='owner')
+        cls.organization = Organization.objects.create(display_name='Organization')
+        Membership.objects.create(user=cls.user, organization=cls.organization, role=Membership.OWNER)
+        cls.project = Project.objects.create(display_name='Project', owner_id=cls.user.id,
+                                             owner_type=ContentType.objects.get_for_model(User))
+
+    def setUp(self):
+        self.broker = RecordingBroker()
+        patcher = mock.patch('utils.events._broker', self.broker)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def post(self, url: str, data: dict):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(url, data, format='json')
+        self.assertIn(response.status_code, (200, 201), response.content)
+
+    def event_types(self):
+        return [(event['type'], event.get('local_id')) for _, event in self.broker.events]
+
+    def test_task_events(self):
+        url = f'/api/project/{self.project.id}/task/'
+        self.post(url + 'create/', {'title': 'First'})
+        self.post(url + 'bulk-create/', {'tasks': [{'title': 'Second'}, {'title': 'Third'}]})
+        self.post(url + 'archive/', {'local_ids': [2]})
+        self.assertEqual(self.event_types(), [
+            ('task.created', 1), ('task.created', 2), ('task.created', 3), ('task.archived', 2)
+        ])
+        collection = TaskCollection.objects.get(project=self.project)
+        self.assertEqual({channel for channel, _ in self.broker.events}, {task_collection_channel(collection.id)})
+
+    def test_discussion_events(self):
+        url = f'/api/organization/{self.organization.id}/discussion/'
+        self.post(url + 'enable/', {})
+        self.post(url + 'topic/create/', {'title': 'Topic', 'comment': {'content': 'First'}})
+        self.post(url + 'comment/create/', {'topic_local_id': 1, 'content': 'Reply'})
+        self.assertEqual([event for _, event in self.broker.events if event['type'] == 'comment.created'], [
+            {'type': 'comment.created', 'topic_local_id': 1, 'local_id': 1},
+            {'type': 'comment.created', 'topic_local_id': 1, 'local_id': 2},
+        ])
+        self.assertIn('topic.created', [event['type'] for _, event in self.broker.events])
+
+    def test_rolled_back(self):
+        with self.captureOnCommitCallbacks(execute=False):
+            self.client.post(f'/api/project/{self.project.id}/task/create/', {'title': 'First'}, format='json')
+        self.assertEqual(self.broker.events, [])
+
+
+@override_settings(EVENT_STREAM_KEEPALIVE=0.05)
+class EventStreamTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='owner')
+        cls.stranger = User.objects.create(username='stranger')
+        cls.project = Project.objects.create(display_name='Project', owner_id=cls.user.id,
+                                             owner_type=ContentType.objects.get_for_model(User))
+        cls.collection = TaskCollection.objects.get(project=cls.project)
+
+    def setUp(self):
+        self.broker = InMemoryBroker()
+        patcher = mock.patch('utils.events._broker', self.broker)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def test_stream(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(f'/api/project/{self.project.id}/task/events/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        chunks = response.streaming_content.__aiter__()
+        self.assertEqual(await chunks.__anext__(), b'retry: 3000\n\n')
+
+        self.broker.publish(task_collection_channel(self.collection.id), {'type': 'task.created', 'local_id': 1})
+        self.assertEqual(await chunks.__anext__(),
+                         b'event: task.created\ndata: {"type": "task.created", "local_id": 1}\n\n')
+        self.assertEqual(await chunks.__anext__(), b': keepalive\n\n')
+
+        # the ASGI handler cancels the response task when the client disconnects
+        pending = asyncio.ensure_future(chunks.__anext__())
+        await asyncio.sleep(0)
+        pending.cancel()
+        with suppress(asyncio.CancelledError):
+            await pending
+        self.assertFalse(self.broker.has_subscribers(task_collection_channel(self.collection.id)))
+
+    async def test_permission(self):
+        url = f'/api/project/{self.project.id}/task/events/'
+        self.assertEqual((await self.async_client.get(url)).status_code, 403)
+        await self.async_client.aforce_login(self.stranger)
+        self.assertEqual((await self.async_client.get(url)).status_code, 403)
+        self.assertEqual(self.broker._subscribers, {})
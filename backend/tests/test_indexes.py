@@ -0,0 +1,67 @@
+from unittest import skipUnless
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from db.models.organization import Organization, Membership
+from db.models.project import Project
+
+User = get_user_model()
+
+
+@skipUnless(connection.vendor == 'sqlite', 'the plans are checked with SQLite EXPLAIN QUERY PLAN')
+class ListIndexesTest(TestCase):
+    """ The page query of each list endpoint searches its index, without sorting the rows """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='owner')
+        cls.organization = Organization.objects.create(display_name='Organization')
+        Membership.objects.create(user=cls.user, organization=cls.organization, role=Membership.OWNER)
+        cls.project = Project.objects.create(display_name='Project', owner_id=cls.organization.id,
+                                             owner_type=ContentType.objects.get_for_model(Organization))
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def post(self, url: str, data: dict):
+        response = self.client.post(url, data, format='json')
+        self.assertIn(response.status_code, (200, 201), response.content)
+        return response
+
+    def assertIndexedPage(self, url: str, data: dict, table: str, *indexes: str):
+        with CaptureQueriesContext(connection) as queries:
+            self.post(url, data)
+        page = [query['sql'] for query in queries.captured_queries
+                if f'FROM "{table}"' in query['sql'] and 'ORDER BY' in query['sql']]
+        self.assertTrue(page, f'No ordered query on {table}.')
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN QUERY PLAN ' + page[-1])
+            plan = [row[-1] for row in cursor.fetchall()]
+        self.assertTrue(any(f'INDEX {index} ' in step for step in plan for index in indexes), plan)
+        self.assertFalse(any('TEMP B-TREE' in step for step in plan), plan)
+
+    def test_list_projects(self):
+        self.assertIndexedPage('/api/project/list/', {'org_id': self.organization.id, 'page': 1, 'page_size': 10},
+                               'db_project', 'project_owner_updated_idx')
+
+    def test_list_tasks(self):
+        url = f'/api/project/{self.project.id}/task/'
+        self.post(url + 'bulk-create/', {'tasks': [{'title': f'Task {i}'} for i in range(5)]})
+        # without statistics, SQLite may walk the sync index backwards, which avoids the sort as well
+        self.assertIndexedPage(url + 'list/', {'page': 1, 'page_size': 10}, 'db_task',
+                               'task_collection_updated_idx', 'task_collection_sync_idx')
+
+    def test_list_topics_and_comments(self):
+        url = f'/api/organization/{self.organization.id}/discussion/'
+        self.post(url + 'enable/', {})
+        for i in range(3):
+            self.post(url + 'topic/create/', {'title': f'Topic {i}', 'comment': {'content': 'First'}})
+        self.post(url + 'comment/create/', {'topic_local_id': 1, 'content': 'Reply'})
+        self.assertIndexedPage(url + 'topic/list/', {'page': 1, 'page_size': 10},
+                               'db_discussiontopic', 'topic_discussion_updated_idx')
+        self.assertIndexedPage(url + 'comment/list/', {'topic_local_id': 1, 'page': 1, 'page_size': 10},
+                               'db_discussioncomment', 'comment_topic_created_idx')
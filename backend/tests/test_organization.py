@@ -0,0 +1,70 @@
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.test import TestCase
+from rest_framework.test import APIClient
+from db.models.discussion import Discussion
+from db.models.organization import Organization, Membership
+from db.models.project import Project
+
+User = get_user_model()
+
+
+class ListUserOrganizationsTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='owner')
+        self.others = [User.objects.create(username=f'user{i}') for i in range(3)]
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def create_organizations(self, count: int):
+        owner_type = ContentType.objects.get_for_model(Organization)
+        for i in range(count):
+            organization = Organization.objects.create(display_name=f'Organization {i}')
+            Membership.objects.create(user=self.user, organization=organization, role=Membership.OWNER)
+            for j, other in enumerate(self.others[:i % 4]):
+                role = Membership.MEMBER if j else Membership.PENDING
+                Membership.objects.create(user=other, organization=organization, role=role)
+            if i % 2:
+                Discussion.objects.create(organization=organization)
+            for _ in range(i % 3):
+                Project.objects.create(display_name='Project', owner_type=owner_type, owner_id=organization.id)
+
+    def list_organizations(self, page_size: int):
+        response = self.client.post('/api/organization/list/', {'page': 1, 'page_size': page_size}, format='json')
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_constant_number_of_queries(self):
+        self.create_organizations(2)
+        with self.assertNumQueries(2):  # count and page
+            self.list_organizations(20)
+        self.create_organizations(18)
+        with self.assertNumQueries(2):
+            data = self.list_organizations(20)
+        self.assertEqual(data['count'], 20)
+        self.assertEqual(len(data['results']), 20)
+
+    def test_annotated_fields(self):
+        self.create_organizations(4)
+        results = {item['display_name']: item for item in self.list_organizations(20)['results']}
+        organization = results['Organization 3']
+        self.assertEqual(organization['role'], Membership.OWNER)
+        self.assertEqual(organization['member_count'], 3)  # the pending invitation is not counted
+        self.assertEqual(organization['owner_count'], 1)
+        self.assertEqual(organization['project_count'], 0)
+        self.assertTrue(organization['is_discussion_enabled'])
+        self.assertEqual(results['Organization 2']['project_count'], 2)
+        self.assertFalse(results['Organization 2']['is_discussion_enabled'])
+
+    def test_invalid_page(self):
+        self.create_organizations(3)
+        for count in ('exact', 'none', 'estimate'):
+            response = self.client.post('/api/organization/list/', {'page': 2, 'page_size': 2, 'count': count},
+                                        format='json')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(response.json()['results']), 1)
+            for data in ({'page': 'x'}, {'page': -1}, {'page_size': 'x'}, {'page_size': -5}):
+                with self.subTest(count=count, data=data):
+                    response = self.client.post('/api/organization/list/', {'page': 1, 'page_size': 2, 'count': count,
+                                                                            **data}, format='json')
+                    self.assertEqual(response.status_code, 400)
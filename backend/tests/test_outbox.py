@@ -0,0 +1,109 @@
+from datetime import timedelta
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.db import DatabaseError
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from db.models.mail import OutgoingEmail
+from db.models.organization import Organization, Membership
+from utils.mails.outbox import OutboxSender, queue_emails, send_queued_emails
+
+User = get_user_model()
+
+
+class CountingBackend(EmailBackend):
+    """ locmem backend counting its connections, failing for recipients in `failing` """
+    opened = 0
+    failing = set()
+
+    def open(self):
+        CountingBackend.opened += 1
+        return True
+
+    def send_messages(self, messages):
+        for message in messages:
+            if set(message.to) & self.failing:
+                raise ConnectionError('Recipient refused')
+        return super().send_messages(messages)
+
+
+@override_settings(EMAIL_OUTBOX_SEND_IN_PROCESS=False, EMAIL_BACKEND='tests.test_outbox.CountingBackend',
+                   DEFAULT_FROM_EMAIL='unica@example.com')
+class OutboxTest(TestCase):
+    def setUp(self):
+        CountingBackend.opened = 0
+        CountingBackend.failing = set()
+
+    def queue(self, *recipients: str):
+        return queue_emails([(f'Hello {to}', [to], 'Text', '<p>Html</p>') for to in recipients])
+
+    def test_invitation_is_queued(self):
+        owner = User.objects.create(username='owner')
+        User.objects.create(username='invitee', email='invitee@example.com')
+        organization = Organization.objects.create(display_name='Organization')
+        Membership.objects.create(user=owner, organization=organization, role=Membership.OWNER)
+        client = APIClient()
+        client.force_authenticate(owner)
+
+        with mock.patch('utils.mails.outbox.wake_sender') as wake_sender, \
+                self.captureOnCommitCallbacks(execute=True):
+            response = client.post(f'/api/organization/{organization.id}/invite/create/',
+                                   {'username': 'invitee'}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(mail.outbox, [])  # nothing is sent within the request
+        wake_sender.assert_called_once()
+        email = OutgoingEmail.objects.get()
+        self.assertEqual((email.to, email.status), (['invitee@example.com'], OutgoingEmail.PENDING))
+
+        self.assertEqual(send_queued_emails(), 1)
+        self.assertEqual(mail.outbox[0].to, ['invitee@example.com'])
+
+    def test_batches_reuse_connections(self):
+        self.queue('a@example.com', 'b@example.com', 'c@example.com')
+        self.assertEqual(send_queued_emails(batch_size=2), 3)
+        self.assertEqual(CountingBackend.opened, 2)
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox),
+                         ['a@example.com', 'b@example.com', 'c@example.com'])
+        self.assertEqual(mail.outbox[0].alternatives[0][1], 'text/html')
+        self.assertEqual(mail.outbox[0].from_email, 'unica@example.com')
+        self.assertFalse(OutgoingEmail.objects.exclude(status=OutgoingEmail.SENT).exists())
+        self.assertEqual(send_queued_emails(), 0)
+
+    @override_settings(EMAIL_OUTBOX_RETRY_DELAY=30, EMAIL_OUTBOX_MAX_ATTEMPTS=3)
+    def test_retry_backoff(self):
+        CountingBackend.failing = {'bad@example.com'}
+        self.queue('bad@example.com', 'good@example.com')
+        self.assertEqual(send_queued_emails(), 1)
+        bad = OutgoingEmail.objects.get(to=['bad@example.com'])
+        self.assertEqual((bad.status, bad.attempts), (OutgoingEmail.PENDING, 1))
+        self.assertIn('Recipient refused', bad.last_error)
+        self.assertAlmostEqual((bad.next_attempt_at - timezone.now()).total_seconds(), 30, delta=5)
+
+        delays = []
+        for _ in range(2):
+            OutgoingEmail.objects.filter(pk=bad.pk).update(next_attempt_at=timezone.now())
+            send_queued_emails()
+            bad.refresh_from_db()
+            delays.append(round((bad.next_attempt_at - timezone.now()).total_seconds()))
+        self.assertEqual(delays[0], 60)  # doubled
+        self.assertEqual((bad.status, bad.attempts), (OutgoingEmail.FAILED, 3))
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_not_due(self):
+        email = self.queue('later@example.com')[0]
+        OutgoingEmail.objects.filter(pk=email.pk).update(next_attempt_at=timezone.now() + timedelta(minutes=1))
+        self.assertEqual(send_queued_emails(), 0)
+        self.assertEqual(mail.outbox, [])
+
+    def test_sender_backs_off_on_database_errors(self):
+        sender = OutboxSender()
+        with mock.patch('utils.mails.outbox.send_queued_emails', side_effect=DatabaseError('database is locked')), \
+                mock.patch.object(sender, 'wake') as wake, self.assertLogs('utils.mails.outbox', 'ERROR'):
+            for _ in range(12):
+                sender._run()
+        delays = [round(call.args[0]) for call in wake.call_args_list]
+        self.assertEqual(delays[:4], [1, 2, 4, 8])
+        self.assertEqual(max(delays), 240)  # the longest delay between delivery attempts
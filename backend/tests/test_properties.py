@@ -0,0 +1,46 @@
+from django.contrib.contenttypes.models import ContentType
+from django.test import TestCase
+from api.serializers.task import TaskSerializer, TaskValuesSerializer
+from db.models.organization import Organization
+from db.models.project import Project
+from db.models.task import Task
+from utils.properties import strip_stale_properties
+
+
+class StalePropertiesTest(TestCase):
+    def setUp(self):
+        organization = Organization.objects.create(display_name='Organization')
+        project = Project.objects.create(display_name='Project', owner_id=organization.id,
+                                         owner_type=ContentType.objects.get_for_model(Organization))
+        self.collection = project.tasks
+        self.collection.add_or_update_global_property({'type': 'number', 'name': 'Estimate'})
+        self.collection.add_or_update_global_property({'type': 'number', 'name': 'Points'})
+        for i in range(3):
+            serializer = TaskSerializer(data={'title': f'Task {i}', 'global_properties': {'Estimate': i, 'Points': 1}},
+                                        partial=True, context={'collection': self.collection})
+            serializer.is_valid(raise_exception=True)
+            serializer.save(collection=self.collection, local_id=i + 1)
+
+    def list_properties(self):
+        tasks = Task.objects.filter(collection=self.collection).order_by('local_id')
+        context = {'collection': self.collection}
+        rows = TaskValuesSerializer(tasks.values(*TaskValuesSerializer.lookups()), many=True, context=context).data
+        self.assertEqual([row['global_properties'] for row in rows],
+                         [task['global_properties'] for task in TaskSerializer(tasks, many=True, context=context).data])
+        return [row['global_properties'] for row in rows]
+
+    def test_additions_keep_values_current(self):
+        self.collection.add_or_update_global_property({'type': 'number', 'name': 'Hours'})
+        self.collection.add_or_update_global_property({'type': 'number', 'name': 'Points'})
+        self.assertGreater(self.collection.revision, self.collection.removal_revision)
+        self.assertEqual(strip_stale_properties(self.collection), 0)
+        self.assertEqual(self.list_properties()[2], {'Estimate': 2, 'Points': 1})
+
+    def test_removal(self):
+        self.collection.remove_global_property('Points')
+        self.assertEqual(self.collection.removal_revision, self.collection.revision)
+        self.assertEqual(self.list_properties()[2], {'Estimate': 2})  # hidden before the cleanup
+        self.collection.add_or_update_global_property({'type': 'number', 'name': 'Hours'})
+        self.assertEqual(strip_stale_properties(self.collection), 3)
+        self.assertEqual(Task.objects.get(collection=self.collection, local_id=3).global_properties, {'Estimate': 2})
+        self.assertEqual(strip_stale_properties(self.collection), 0)
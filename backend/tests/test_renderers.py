@@ -0,0 +1,111 @@
+import datetime
+import decimal
+import enum
+import io
+import uuid
+from unittest import skipIf
+from django.test import SimpleTestCase
+from django.utils.translation import gettext_lazy
+from rest_framework import parsers, renderers
+from rest_framework.exceptions import ParseError
+from api.parsers import FastJSONParser
+from api.renderers import FastJSONRenderer, orjson
+
+PAYLOADS = [
+    None, 0, -1, True, 'text', [], {},
+    {'id': 1, 'title': 'Task', 'description': None, 'archived': False, 'tags': ['a', 'b']},
+    {'nested': [{'deep': [[], {}, [None, 1, 'x']]}], 'empty': ''},
+    {'unicode': '中文 émoji 🐛', 'escapes': 'quote " backslash \\ tab \t newline \n nul \x00'},
+    {'digest': '3e5a9f0e', 'version': '1.0.0000', 'exponent': '1e16'},
+    {'separators': 'line   paragraph  '},
+    {'int': 2 ** 63 - 1, 'negative': -2 ** 63, 'big': 2 ** 64, 'huge': -10 ** 30},
+    {'floats': [0.0, -0.0, 1.5, 0.1, 1 / 3, 0.0001, 123456.789, 1e15, 1e16, 1.5e16, 1e300, 5e-324]},
+    {'small': [0.00001, -2e-05, 1e-7, 0.00012345]},
+    {'datetime': datetime.datetime(2026, 10, 18, 11, 0, 0, 123456, tzinfo=datetime.timezone.utc),
+     'naive': datetime.datetime(2026, 10, 18, 11, 0), 'date': datetime.date(2026, 10, 18),
+     'time': datetime.time(11, 0, 30), 'duration': datetime.timedelta(days=1, seconds=5)},
+    {'decimal': decimal.Decimal('1.50'), 'small_decimal': decimal.Decimal('0.00001'), 'uuid': uuid.UUID('12345678-1234-5678-1234-567812345678')},
+    {'lazy': gettext_lazy('Hello'), 'tuple': (1, 2), 'set_like': frozenset()},
+    {1: 'int key', 'str': 'str key'},
+    [{'id': i, 'title': f'Task {i}', 'estimate': i * 0.25, 'parent': None} for i in range(50)],
+]
+
+
+class Color(enum.Enum):
+    RED = 'red'
+
+
+@skipIf(orjson is None, 'orjson is not installed')
+class FastJSONRendererTest(SimpleTestCase):
+    def assertSameRendering(self, data, accepted_media_type=None, renderer_context=None):
+        expected = renderers.JSONRenderer().render(data, accepted_media_type, renderer_context)
+        actual = FastJSONRenderer().render(data, accepted_media_type, renderer_context)
+        self.assertEqual(actual, expected)
+
+    def test_payloads(self):
+        for data in PAYLOADS:
+            with self.subTest(data=data):
+                self.assertSameRendering(data)
+
+    def test_indent(self):
+        for media_type in ('application/json; indent=2', 'application/json; indent=4'):
+            for data in PAYLOADS:
+                with self.subTest(media_type=media_type, data=data):
+                    self.assertSameRendering(data, media_type)
+        self.assertSameRendering(PAYLOADS[7], None, {'indent': 2})
+
+    def test_unsupported(self):
+        for data in ({'color': Color.RED}, [object()], {datetime.date(2026, 10, 18): 'date key'}):
+            with self.subTest(data=data):
+                with self.assertRaises(TypeError):
+                    renderers.JSONRenderer().render(data)
+                with self.assertRaises(TypeError):
+                    FastJSONRenderer().render(data)
+
+    def test_non_finite_floats(self):
+        for value in (float('nan'), float('inf'), float('-inf'), decimal.Decimal('NaN')):
+            for data in (value, [value], {'value': value, 'other': None}):
+                with self.subTest(data=data):
+                    with self.assertRaises(ValueError):
+                        renderers.JSONRenderer().render(data)
+                    with self.assertRaises(ValueError):
+                        FastJSONRenderer().render(data)
+
+
+@skipIf(orjson is None, 'orjson is not installed')
+class FastJSONParserTest(SimpleTestCase):
+    def parse(self, parser, raw: bytes):
+        return parser.parse(io.BytesIO(raw), 'application/json', {})
+
+    def assertSameParsing(self, raw: bytes):
+        expected = self.parse(parsers.JSONParser(), raw)
+        actual = self.parse(FastJSONParser(), raw)
+        self.assertEqual(actual, expected)
+        self.assertEqual(repr(actual), repr(expected))  # same types, e.g. int rather than float
+
+    def test_payloads(self):
+        for data in PAYLOADS[1:]:  # None renders to an empty body
+            with self.subTest(data=data):
+                self.assertSameParsing(renderers.JSONRenderer().render(data))
+
+    def test_numbers(self):
+        for raw in (b'1', b'-0', b'1.0', b'1e5', b'1E+5', b'-2e-05', b'0.1', b'123456789012345678',
+                    b'1234567890123456789', b'-9223372036854775809', b'18446744073709551616', b'1' * 40,
+                    b'[1.5, 12345678901234567890.5]'):
+            with self.subTest(raw=raw):
+                self.assertSameParsing(raw)
+
+    def test_strings(self):
+        for raw in ('"中文"'.encode(), b'"\\u4e2d"', b'"\\ud83d\\udc1b"', b'"\\ud800"',
+                    b'{"a": "b", "a": "c"}', b' [ ] '):
+            with self.subTest(raw=raw):
+                self.assertSameParsing(raw)
+
+    def test_invalid(self):
+        for raw in (b'', b'{', b'[1,]', b"{'a': 1}", b'NaN', b'[Infinity]', b'\xff'):
+            with self.subTest(raw=raw):
+                with self.assertRaises(ParseError) as expected:
+                    self.parse(parsers.JSONParser(), raw)
+                with self.assertRaises(ParseError) as actual:
+                    self.parse(FastJSONParser(), raw)
+                self.assertEqual(str(actual.exception), str(expected.exception))
@@ -2,6 +2,7 @@
 ASGI config for unica project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Serving under ASGI is required by the server-sent event streams (``api.views.events``).
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.0/howto/deployment/asgi/
@@ -69,6 +69,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'api.middleware.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -120,6 +121,21 @@ SESSION_EXPIRE_AT_BROWSER_CLOSE = False
 SESSION_SAVE_EVERY_REQUEST = True
 
 
+# Permission
+
+# Seconds to keep resolved organization memberships in the shared cache, 0 to disable.
+# Memberships are always memoized within a single request.
+PERMISSION_CACHE_TIMEOUT = int(os.getenv('PERMISSION_CACHE_TIMEOUT', 0))
+
+
+# Project Activity
+
+# Project.updated_at is only rewritten when the stored value is older than this (seconds)
+PROJECT_ACTIVITY_GRANULARITY = 30
+# Coalesce activity updates in process and flush them every N seconds, 0 to write immediately
+PROJECT_ACTIVITY_FLUSH_INTERVAL = 0
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
@@ -162,6 +178,9 @@ STATIC_URL = 'static/'
 MEDIA_ROOT = os.environ.get('MEDIA_ROOT', 'user_content/')
 MEDIA_URL = os.environ.get('MEDIA_URL', '/user_content/')
 
+# Sizes (px) of the square variants of uploaded avatars, stored as WebP and PNG
+AVATAR_SIZES = [32, 64, 256]
+
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
@@ -183,9 +202,34 @@ REST_FRAMEWORK = {
     ],
     'DEFAULT_THROTTLE_RATES': {
         'discussion': '12/minute',  # This translates to 1 request every 5 seconds (12 requests per minute).
-    }
+    },
+    # Same output as the default JSON renderer and parser, faster when orjson is installed
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
 
+# Smallest JSON response compressed by api.middleware.CompressionMiddleware, in bytes
+RESPONSE_COMPRESSION_MIN_SIZE = 1024
+
+# Seconds to cache row counts requested with count='estimate' (non-PostgreSQL databases)
+QUERY_COUNT_CACHE_TIMEOUT = 60
+
+# Full-text search backend (dotted path), None to pick one for the database (SQLite FTS5 or PostgreSQL)
+SEARCH_BACKEND = None
+
+# Broker of the server-sent event streams (dotted path), None for the in-process broker (a single ASGI worker)
+EVENT_BROKER = None
+
+# Seconds between keepalive comments on idle event streams
+EVENT_STREAM_KEEPALIVE = 15
+
 # OAuth Providers
 
 OAUTH_PROVIDERS = os.getenv('OAUTH_PROVIDERS').split(',')
@@ -208,4 +252,19 @@ EMAIL_HOST = os.getenv('EMAIL_HOST')
 EMAIL_PORT = os.getenv('EMAIL_PORT')
 EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER')
 EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD')
-DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL')
\ No newline at end of file
+DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL')
+EMAIL_TIMEOUT = 30
+
+# Outbox (queued emails, see utils.mails.outbox)
+# Deliver queued emails from a background thread of the web process,
+# set to False when `manage.py send_queued_emails` runs as a separate worker
+EMAIL_OUTBOX_SEND_IN_PROCESS = True
+EMAIL_OUTBOX_BATCH_SIZE = 50  # emails sent over one SMTP connection
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+EMAIL_OUTBOX_RETRY_DELAY = 30  # seconds before the first retry, doubled after each failure
+EMAIL_OUTBOX_SEND_TIMEOUT = 300  # seconds before an unfinished batch is picked up again
+
+# Remove the values of deleted task properties from a background thread of the web process,
+# set to False when `manage.py strip_stale_properties` runs periodically instead
+TASK_PROPERTY_CLEANUP_IN_PROCESS = True
+TASK_PROPERTY_CLEANUP_CHUNK_SIZE = 1000  # tasks updated per transaction
\ No newline at end of file
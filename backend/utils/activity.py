@@ -0,0 +1,83 @@
+import atexit
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+
+
+def _update_project_activity(project_id: int, at: datetime) -> None:
+    from db.models.project import Project
+    granularity = timedelta(seconds=getattr(settings, 'PROJECT_ACTIVITY_GRANULARITY', 0))
+    # Narrow UPDATE, skipped when the stored value is recent enough
+    Project.objects.filter(pk=project_id, updated_at__lt=at - granularity).update(updated_at=at)
+
+
+class ProjectActivityBuffer:
+    """
+    In-process buffer coalescing project activity, flushed every `interval` seconds
+    by a background timer (armed on demand) and at process exit.
+    """
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._pending: Dict[int, datetime] = {}
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+
+    def record(self, project_id: int, at: datetime) -> None:
+        with self._lock:
+            if project_id not in self._pending or self._pending[project_id] < at:
+                self._pending[project_id] = at
+            if self._timer is None:
+                self._timer = threading.Timer(self.interval, self._flush_in_background)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._timer = None
+        for project_id, at in pending.items():
+            _update_project_activity(project_id, at)
+
+    def _flush_in_background(self) -> None:
+        try:
+            self.flush()
+        finally:
+            connections.close_all()  # connections opened by this thread only
+
+
+_buffer: Optional[ProjectActivityBuffer] = None
+_buffer_lock = threading.Lock()
+
+
+def _get_buffer() -> Optional[ProjectActivityBuffer]:
+    global _buffer
+    interval = getattr(settings, 'PROJECT_ACTIVITY_FLUSH_INTERVAL', 0)
+    if not interval:
+        return None
+    with _buffer_lock:
+        if _buffer is None:
+            _buffer = ProjectActivityBuffer(interval)
+            atexit.register(_buffer.flush)
+    return _buffer
+
+
+def record_project_activity(project_id: int, at: Optional[datetime] = None) -> None:
+    """
+    Mark a project as active, e.g. after one of its tasks changed.
+
+    `Project.updated_at` is only written when the stored value is older than
+    PROJECT_ACTIVITY_GRANULARITY seconds. With PROJECT_ACTIVITY_FLUSH_INTERVAL set,
+    the writes are coalesced in process and flushed periodically.
+
+    :param project_id: ID of the project.
+    :param at: Time of the activity, defaults to now.
+    """
+    at = at or timezone.now()
+    buffer = _get_buffer()
+    if buffer is not None:
+        buffer.record(project_id, at)
+    else:
+        _update_project_activity(project_id, at)
@@ -0,0 +1,160 @@
+import asyncio
+import threading
+from typing import Dict, Iterable, Optional, Set
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.utils.module_loading import import_string
+from db.models.discussion import DiscussionTopic, DiscussionComment
+from db.models.task import Task
+
+
+class EventBroker:
+    """
+    Interface of event brokers, which fan out events published on a channel to its subscribers.
+    `publish` may be called from any thread, `subscribe` is called in the event loop of an ASGI server.
+    """
+    def publish(self, channel: str, event: dict):
+        raise NotImplementedError
+
+    def subscribe(self, channel: str) -> 'Subscription':
+        """ Start receiving the events of a channel, until the subscription is closed """
+        raise NotImplementedError
+
+    def has_subscribers(self, channel: str) -> bool:
+        return True
+
+
+class Subscription:
+    """ Async iterator of the events of a channel, queued since it was created """
+    def __init__(self, broker: 'InMemoryBroker', channel: str):
+        self.broker, self.channel = broker, channel
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue()
+        self.closed = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> dict:
+        if self.closed:
+            raise StopAsyncIteration
+        event = await self.queue.get()
+        if event['type'] == 'resync':
+            await self.aclose()
+        return event
+
+    async def aclose(self):
+        self.closed = True
+        self.broker._unsubscribe(self)
+
+
+class InMemoryBroker(EventBroker):
+    """
+    Fan-out within the current process. It is enough for a single ASGI worker (and for tests);
+    deployments with several processes need a broker backed by a shared service.
+    A subscriber that falls more than `max_pending` events behind receives a `resync` event and is dropped.
+    """
+    max_pending = 100
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+
+    def publish(self, channel, event):
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for subscription in subscribers:
+            subscription.loop.call_soon_threadsafe(self._put, subscription.queue, event)
+
+    @staticmethod
+    def _put(queue: asyncio.Queue, event: dict):
+        if queue.qsize() >= InMemoryBroker.max_pending:
+            if queue.qsize() == InMemoryBroker.max_pending:
+                queue.put_nowait({'type': 'resync'})
+            return
+        queue.put_nowait(event)
+
+    def subscribe(self, channel):
+        subscription = Subscription(self, channel)
+        with self._lock:
+            self._subscribers.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def _unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.channel, set())
+            subscribers.discard(subscription)
+            if not subscribers:
+                self._subscribers.pop(subscription.channel, None)
+
+    def has_subscribers(self, channel):
+        return bool(self._subscribers.get(channel))
+
+
+_broker: Optional[EventBroker] = None
+
+
+def get_event_broker() -> EventBroker:
+    """ Return the configured EVENT_BROKER (a dotted path), the in-process broker by default """
+    global _broker
+    if _broker is None:
+        path = getattr(settings, 'EVENT_BROKER', None)
+        _broker = import_string(path)() if path else InMemoryBroker()
+    return _broker
+
+
+def discussion_channel(discussion_id) -> str:
+    return f'discussion:{discussion_id}'
+
+
+def task_collection_channel(collection_id) -> str:
+    return f'collection:{collection_id}'
+
+
+def publish(channel: str, events: Iterable[dict]):
+    """ Publish events once the current transaction commits, so that subscribers never see rolled back changes """
+    broker = get_event_broker()
+    if not broker.has_subscribers(channel):
+        return
+    events = list(events)
+    transaction.on_commit(lambda: [broker.publish(channel, event) for event in events])
+
+
+def publish_task_events(collection_id, action: str, local_ids: Iterable[int]):
+    """ Publish events of tasks saved without signals, e.g. by bulk_create() or QuerySet.update() """
+    publish(task_collection_channel(collection_id), [
+        {'type': f'task.{action}', 'local_id': local_id} for local_id in local_ids
+    ])
+
+
+def _action(instance, created: bool) -> str:
+    if created:
+        return 'created'
+    return 'deleted' if instance.deleted else 'updated'
+
+
+def _on_task_save(sender, instance, created=False, raw=False, **kwargs):
+    if not raw:
+        action = 'archived' if instance.archived and not instance.deleted else _action(instance, created)
+        publish_task_events(instance.collection_id, action, [instance.local_id])
+
+
+def _on_topic_save(sender, instance, created=False, raw=False, **kwargs):
+    if not raw:
+        publish(discussion_channel(instance.discussion_id), [
+            {'type': f'topic.{_action(instance, created)}', 'topic_local_id': instance.local_id}
+        ])
+
+
+def _on_comment_save(sender, instance, created=False, raw=False, **kwargs):
+    if not raw:
+        topic = instance.topic
+        publish(discussion_channel(topic.discussion_id), [
+            {'type': f'comment.{_action(instance, created)}', 'topic_local_id': topic.local_id, 'local_id': instance.local_id}
+        ])
+
+
+post_save.connect(_on_task_save, sender=Task, dispatch_uid='events_task')
+post_save.connect(_on_topic_save, sender=DiscussionTopic, dispatch_uid='events_topic')
+post_save.connect(_on_comment_save, sender=DiscussionComment, dispatch_uid='events_comment')
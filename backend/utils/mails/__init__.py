@@ -1,32 +1,91 @@
 import os
-from typing import List, Dict, Any
-from django.core.mail import EmailMultiAlternatives
-from django.template.loader import render_to_string
-from django.conf import settings
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from django.template import TemplateDoesNotExist
+from django.template.loader import get_template
+from utils.mails.outbox import queue_emails
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(__file__), 'templates')
+
+
+@lru_cache(maxsize=None)
+def _get_templates(template_name: str):
+    """
+    Load and compile the `.txt` and `.html` templates of an email once per process.
+
+    :return: The (text, html) templates, each None when the file does not exist.
+    """
+    templates = []
+    for extension in ('txt', 'html'):
+        try:
+            templates.append(get_template(f'{template_name}.{extension}'))
+        except TemplateDoesNotExist:
+            templates.append(None)
+    return tuple(templates)
+
+
+def preload_templates() -> None:
+    """ Compile every email template ahead of the first email, e.g. at startup """
+    for file_name in os.listdir(TEMPLATE_DIR):
+        _get_templates(os.path.splitext(file_name)[0])
+
+
+def render_emails(template_name: str, params_list: Iterable[Dict[str, Any]]) -> List[Tuple[str, Optional[str]]]:
+    """
+    Render an email template for many payloads, reusing the compiled templates.
+
+    :param template_name: The base name of the template (without extension).
+    :param params_list: The parameters of each email.
+    :return: The (text, html) contents of each email, html is None without an html template.
+        Empty when the template has no `.txt` file.
+    """
+    text_template, html_template = _get_templates(template_name)
+    if text_template is None:
+        return []
+    return [
+        (text_template.render(params), html_template.render(params) if html_template else None)
+        for params in params_list
+    ]
 
 
 def send_email(template_name: str, subject: str, to: List[str], params: Dict[str, Any]) -> None:
     """
-    Sends an email using a specified template.
+    Sends an email using a specified template. The email is rendered immediately,
+    and delivered in the background through the outbox (see `utils.mails.outbox`).
 
     :param template_name: The base name of the template (without extension).
     :param subject: The subject of the email.
     :param to: The recipients' email address.
     :param params: A dictionary containing the parameters to be rendered in the template.
     """
-    use_html = os.path.exists(os.path.join('templates', f'{template_name}.html'))
-    if not os.path.exists(os.path.join('templates', f'{template_name}.txt')):
-        return  # return silently
-    html_content = render_to_string(f'{template_name}.html', params)
-    text_content = render_to_string(f'{template_name}.txt', params)
-
-    email = EmailMultiAlternatives(
-        subject, 
-        text_content, 
-        settings.DEFAULT_FROM_EMAIL, 
-        to
-    )
-    if use_html:
-        email.attach_alternative(html_content, "text/html")
-
-    email.send()
+    send_mass_emails(template_name, [(subject, to, params)])
+
+
+def send_emails(template_name: str, subject: str, recipients: List[str], params: Dict[str, Any]) -> None:
+    """
+    Sends the same templated email to each of the recipients, rendered once.
+
+    :param template_name: The base name of the template (without extension).
+    :param subject: The subject of the emails.
+    :param recipients: The recipients' email addresses, each gets its own email.
+    :param params: A dictionary containing the parameters to be rendered in the template.
+    """
+    if not recipients:
+        return
+    for text_content, html_content in render_emails(template_name, [params]):
+        queue_emails([(subject, [recipient], text_content, html_content) for recipient in recipients])
+
+
+def send_mass_emails(template_name: str, messages: Iterable[Tuple[str, List[str], Dict[str, Any]]]) -> None:
+    """
+    Sends a templated email per message, rendered in a batch and queued with a single query.
+
+    :param template_name: The base name of the template (without extension).
+    :param messages: The (subject, recipients, params) of each email.
+    """
+    messages = list(messages)
+    contents = render_emails(template_name, [params for _, _, params in messages])
+    queue_emails([
+        (subject, to, text_content, html_content)
+        for (subject, to, _), (text_content, html_content) in zip(messages, contents)
+    ])
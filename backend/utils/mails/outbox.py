@@ -0,0 +1,181 @@
+import atexit
+import logging
+import threading
+from datetime import timedelta
+from typing import Iterable, List, Optional, Tuple
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import connections, transaction, DatabaseError
+from django.utils import timezone
+from db.models.mail import OutgoingEmail
+
+logger = logging.getLogger(__name__)
+
+
+def queue_emails(messages: Iterable[Tuple[str, List[str], str, Optional[str]]],
+                 from_email: Optional[str] = None) -> List[OutgoingEmail]:
+    """
+    Queue many rendered emails, given as (subject, to, text_content, html_content), inserted in a single query.
+    """
+    now = timezone.now()
+    emails = OutgoingEmail.objects.bulk_create([
+        OutgoingEmail(
+            subject=subject, to=to, text_content=text_content, html_content=html_content,
+            from_email=from_email or settings.DEFAULT_FROM_EMAIL, next_attempt_at=now
+        )
+        for subject, to, text_content, html_content in messages
+    ], batch_size=500)
+    if emails:
+        transaction.on_commit(wake_sender)
+    return emails
+
+
+def _claim_due_emails(batch_size: int) -> List[OutgoingEmail]:
+    now = timezone.now()
+    lease = now + timedelta(seconds=getattr(settings, 'EMAIL_OUTBOX_SEND_TIMEOUT', 300))
+    with transaction.atomic():
+        emails = list(
+            OutgoingEmail.objects.select_for_update(skip_locked=True)
+            .filter(status=OutgoingEmail.PENDING, next_attempt_at__lte=now)
+            .order_by('next_attempt_at')[:batch_size]
+        )
+        # Lease the batch, so other senders skip it until it times out (e.g. this process died)
+        OutgoingEmail.objects.filter(pk__in=[email.pk for email in emails]).update(next_attempt_at=lease)
+    return emails
+
+
+def _to_message(email: OutgoingEmail, connection) -> EmailMultiAlternatives:
+    message = EmailMultiAlternatives(email.subject, email.text_content, email.from_email, email.to,
+                                     connection=connection)
+    if email.html_content:
+        message.attach_alternative(email.html_content, "text/html")
+    return message
+
+
+def _retry_delay(attempts: int, base_delay: float = None) -> float:
+    """ Exponential backoff, in seconds, after `attempts` consecutive failures """
+    if base_delay is None:
+        base_delay = getattr(settings, 'EMAIL_OUTBOX_RETRY_DELAY', 30)
+    return base_delay * 2 ** (attempts - 1)
+
+
+def _record_failure(email: OutgoingEmail, error: Exception):
+    email.attempts += 1
+    email.last_error = repr(error)
+    if email.attempts >= getattr(settings, 'EMAIL_OUTBOX_MAX_ATTEMPTS', 5):
+        email.status = OutgoingEmail.FAILED
+    else:
+        email.next_attempt_at = timezone.now() + timedelta(seconds=_retry_delay(email.attempts))
+    email.save(update_fields=['attempts', 'last_error', 'status', 'next_attempt_at'])
+
+
+def send_queued_emails(batch_size: Optional[int] = None) -> int:
+    """
+    Deliver the due emails of the outbox, a batch at a time over a single reused connection.
+
+    :return: The number of emails sent.
+    """
+    batch_size = batch_size or getattr(settings, 'EMAIL_OUTBOX_BATCH_SIZE', 50)
+    sent = 0
+    while True:
+        emails = _claim_due_emails(batch_size)
+        if not emails:
+            return sent
+
+        connection = get_connection()
+        try:
+            connection.open()
+        except Exception as e:
+            # The server is unreachable, the whole batch is retried later
+            for email in emails:
+                _record_failure(email, e)
+            return sent
+        try:
+            for email in emails:
+                try:
+                    connection.send_messages([_to_message(email, connection)])
+                except Exception as e:
+                    _record_failure(email, e)
+                    # The connection may be broken, start over with a fresh one
+                    connection.close()
+                    connection.open()
+                else:
+                    email.attempts += 1
+                    email.status, email.sent_at = OutgoingEmail.SENT, timezone.now()
+                    email.save(update_fields=['attempts', 'status', 'sent_at'])
+                    sent += 1
+        except Exception:
+            # Reopening failed, leased emails are retried once the lease expires
+            return sent
+        finally:
+            connection.close()
+
+
+class OutboxSender:
+    """
+    In-process background sender of the outbox, woken up after emails are queued
+    and re-armed for the next retry while failed emails are pending.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        self._due_at = None
+        self._database_errors = 0  # consecutive, for the backoff
+
+    def wake(self, delay: float = 0):
+        due_at = timezone.now() + timedelta(seconds=delay)
+        with self._lock:
+            if self._timer is not None:
+                if self._due_at <= due_at:
+                    return
+                self._timer.cancel()
+            self._due_at = due_at
+            self._timer = threading.Timer(delay, self._run)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _run(self):
+        with self._lock:
+            self._timer = None
+        try:
+            send_queued_emails()
+            retry_at = OutgoingEmail.objects.filter(status=OutgoingEmail.PENDING).order_by(
+                'next_attempt_at').values_list('next_attempt_at', flat=True).first()
+            self._database_errors = 0
+        except DatabaseError:
+            # e.g. SQLite is locked by a concurrent writer: try again shortly, then back off while
+            # the error persists, up to the longest delay between delivery attempts
+            self._database_errors += 1
+            max_delay = _retry_delay(getattr(settings, 'EMAIL_OUTBOX_MAX_ATTEMPTS', 5) - 1)
+            delay = min(_retry_delay(self._database_errors, base_delay=1), max_delay)
+            logger.exception("Cannot deliver the email outbox, retrying in %d seconds", delay)
+            retry_at = timezone.now() + timedelta(seconds=delay)
+        finally:
+            connections.close_all()  # connections opened by this thread only
+        if retry_at is not None:
+            self.wake(max((retry_at - timezone.now()).total_seconds(), 0))
+
+    def stop(self):
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+
+_sender: Optional[OutboxSender] = None
+_sender_lock = threading.Lock()
+
+
+def wake_sender():
+    """
+    Deliver the queued emails soon, in a background thread of this process.
+    Disabled by EMAIL_OUTBOX_SEND_IN_PROCESS = False, e.g. when `send_queued_emails` runs as a separate worker.
+    """
+    global _sender
+    if not getattr(settings, 'EMAIL_OUTBOX_SEND_IN_PROCESS', True):
+        return
+    with _sender_lock:
+        if _sender is None:
+            _sender = OutboxSender()
+            atexit.register(_sender.stop)
+    _sender.wake()
@@ -0,0 +1,64 @@
+from typing import Optional
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models.signals import post_save, post_delete, pre_delete
+from django.dispatch import receiver
+from db.models.organization import Organization, Membership
+
+
+def _membership_cache_key(organization_id, user_id) -> str:
+    return f'unica:membership:{organization_id}:{user_id}'
+
+
+def _get_request_memo(request) -> dict:
+    # Memoize on the underlying HttpRequest, so that every wrapper in the
+    # same request (including nested permission decorators) shares the result.
+    http_request = getattr(request, '_request', request)
+    if not hasattr(http_request, '_membership_memo'):
+        http_request._membership_memo = {}
+    return http_request._membership_memo
+
+
+def get_membership(request, organization_id) -> Optional[Membership]:
+    """
+    Resolve the membership of the authenticated user in an organization.
+
+    The result is memoized on the request, and optionally backed by the shared cache
+    for PERMISSION_CACHE_TIMEOUT seconds (disabled when the timeout is 0).
+
+    :param request: The current request.
+    :param organization_id: ID of the organization.
+    :return: The Membership (with its organization loaded), or None if the user is not in the organization.
+    """
+    memo = _get_request_memo(request)
+    key = str(organization_id)
+    if key in memo:
+        return memo[key]
+
+    user = request.user
+    timeout = getattr(settings, 'PERMISSION_CACHE_TIMEOUT', 0)
+    cache_key = _membership_cache_key(organization_id, user.id)
+
+    membership = cache.get(cache_key) if timeout else None
+    if membership is None:
+        membership = Membership.objects.select_related('organization').filter(
+            organization_id=organization_id, user=user
+        ).first()
+        if membership is not None and timeout:
+            cache.set(cache_key, membership, timeout)
+
+    memo[key] = membership
+    return membership
+
+
+@receiver([post_save, post_delete], sender=Membership)
+def _invalidate_membership(sender, instance, **kwargs):
+    cache.delete(_membership_cache_key(instance.organization_id, instance.user_id))
+
+
+@receiver([post_save, pre_delete], sender=Organization)
+def _invalidate_organization(sender, instance, **kwargs):
+    # Cached memberships carry a copy of the organization, drop them all
+    # (before a deletion, whose cascade removes the memberships first)
+    user_ids = Membership.objects.filter(organization_id=instance.id).values_list('user_id', flat=True)
+    cache.delete_many([_membership_cache_key(instance.id, user_id) for user_id in user_ids])
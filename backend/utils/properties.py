@@ -0,0 +1,195 @@
+import threading
+from typing import Iterable, List
+from django.conf import settings
+from django.db import connections, router, transaction, DatabaseError
+from django.db.models import F, Func, JSONField, OuterRef, Q, QuerySet, Subquery, Value
+from django.db.models.expressions import RawSQL
+from rest_framework.exceptions import ValidationError
+from utils.query import QueryOptions
+
+PROPERTY_PREFIX = 'properties.'
+PROPERTY_LOOKUPS = {
+    'label': ['exact', 'in', 'isnull'],
+    'number': ['exact', 'in', 'gt', 'gte', 'lt', 'lte', 'isnull'],
+}
+
+
+def _check_number(value, key: str, integer: bool = False):
+    if isinstance(value, bool) or not isinstance(value, int if integer else (int, float)):
+        raise ValidationError({'filters': f"Invalid value for '{key}'."})
+    return value
+
+
+def filter_tasks_by_properties(queryset: QuerySet, collection, options: QueryOptions) -> QuerySet:
+    """
+    Apply the filters and ordering on global properties of `options` to tasks of a collection,
+    with indexed queries on `TaskPropertyValue`. They are removed from `options`, whose other
+    filters and ordering are left to the QueryExecutor.
+
+    Filters are keyed by `properties.<name>[__<lookup>]`, e.g. {"properties.Status__in": [1, 2]}
+    for tasks with either label option or {"properties.Estimate__gte": 3}, and `isnull` for tasks
+    without a value. Tasks are sorted by a property with `order_by`, e.g. "-properties.Estimate",
+    by the lowest option id for labels, tasks without a value come last.
+
+    :raises ValidationError: For undefined properties, unsupported lookups or invalid values.
+    """
+    from db.models.task import TaskPropertyValue
+    types = {prop['name']: prop['type'] for prop in collection.global_properties}
+    values = TaskPropertyValue.objects.filter(collection=collection)
+
+    if not isinstance(options.filters or {}, dict):
+        raise ValidationError({'filters': 'Must be an object.'})
+    filters = {}
+    for key, value in (options.filters or {}).items():
+        if not key.startswith(PROPERTY_PREFIX):
+            filters[key] = value
+            continue
+        name, _, lookup = key[len(PROPERTY_PREFIX):].partition('__')
+        lookup = lookup or 'exact'
+        if name not in types or lookup not in PROPERTY_LOOKUPS[types[name]]:
+            raise ValidationError({'filters': f"Unsupported filter '{key}'."})
+        matches = values.filter(name=name)
+        if lookup == 'isnull':
+            queryset = queryset.exclude(pk__in=matches.values('task_id')) if value else \
+                queryset.filter(pk__in=matches.values('task_id'))
+            continue
+        column = 'option_id' if types[name] == 'label' else 'number'
+        integer = types[name] == 'label'
+        if lookup == 'in':
+            if not isinstance(value, list):
+                raise ValidationError({'filters': f"Invalid value for '{key}', a list is expected."})
+            value = [_check_number(item, key, integer) for item in value]
+        else:
+            _check_number(value, key, integer)
+        # uncorrelated subquery, served by the (collection, name, value) indexes
+        queryset = queryset.filter(pk__in=matches.filter(**{f'{column}__{lookup}': value}).values('task_id'))
+    options.filters = filters
+
+    order_by = options.order_by or ''
+    if isinstance(order_by, str) and order_by.lstrip('-').startswith(PROPERTY_PREFIX):
+        name = order_by.lstrip('-')[len(PROPERTY_PREFIX):]
+        if name not in types:
+            raise ValidationError({'order_by': f"Unknown property '{name}'."})
+        column = 'option_id' if types[name] == 'label' else 'number'
+        queryset = queryset.annotate(property_order=Subquery(
+            values.filter(task=OuterRef('pk'), name=name).order_by(column).values(column)[:1]
+        ))
+        order = F('property_order').desc(nulls_last=True) if order_by.startswith('-') \
+            else F('property_order').asc(nulls_last=True)
+        queryset = queryset.order_by(order, '-updated_at')
+        options.order_by = None
+    return queryset
+
+
+def _json_remove_expression(names: List[str], using: str):
+    """
+    An expression removing the keys from `global_properties` in the database, None when it is not supported.
+    """
+    vendor = connections[using].vendor
+    if vendor == 'postgresql':
+        return RawSQL('"global_properties" - %s::text[]', (names,), output_field=JSONField())
+    if vendor == 'sqlite' and not any('"' in name for name in names):
+        paths = [Value(f'$."{name}"') for name in names]
+        return Func('global_properties', *paths, function='json_remove', output_field=JSONField())
+    return None
+
+
+def strip_task_properties(collection_id: int, names: Iterable[str], revision: int, chunk_size: int = None) -> int:
+    """
+    Remove the values of deleted global properties from the tasks of a collection, a chunk of tasks at a time,
+    and mark the tasks as matching the definitions of `revision`, so that readers stop checking their values.
+    Only tasks whose values predate `revision` are changed, values saved since then are up to date.
+
+    :param names: Every property undefined at `revision` that the tasks may hold.
+    :return: The number of tasks processed.
+    """
+    from db.models.task import Task, TaskPropertyValue
+    names = list(names)
+    chunk_size = chunk_size or getattr(settings, 'TASK_PROPERTY_CLEANUP_CHUNK_SIZE', 1000)
+    using = router.db_for_write(Task)
+    stale = Task.objects.using(using).filter(collection_id=collection_id, properties_revision__lt=revision)
+    holding = stale
+    if not any('"' in name for name in names):
+        # the key lookup does not quote names with double quotes on SQLite
+        holding = stale.filter(global_properties__has_any_keys=names) if names else stale.none()
+    expression = _json_remove_expression(names, using) if names else None
+    processed, last_pk = 0, 0
+    while True:
+        with transaction.atomic(using=using):
+            pks = list(stale.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)[:chunk_size])
+            if not pks:
+                return processed
+            if expression is not None:
+                # updated_at is left alone, readers never see the removed keys anyway
+                holding.filter(pk__in=pks).update(global_properties=expression, properties_revision=revision)
+            elif names:
+                tasks = list(holding.filter(pk__in=pks).only('pk', 'global_properties').select_for_update())
+                for task in tasks:
+                    for name in names:
+                        task.global_properties.pop(name, None)
+                    task.properties_revision = revision
+                Task.objects.using(using).bulk_update(tasks, ['global_properties', 'properties_revision'])
+            if names:
+                TaskPropertyValue.objects.using(using).filter(task__in=pks, name__in=names).delete()
+            # the other tasks of the chunk hold none of the removed properties
+            stale.filter(pk__in=pks).update(properties_revision=revision)
+        processed += len(pks)
+        last_pk = pks[-1]
+
+
+def strip_stale_properties(collection) -> int:
+    """
+    Remove the values of every undefined property from the tasks of a collection, given with its
+    current `global_properties` and `removal_revision`.
+
+    :return: The number of tasks processed.
+    """
+    from db.models.task import Task
+    defined = {prop['name'] for prop in collection.global_properties}
+    names = set()
+    stale = Task.objects.filter(collection=collection, properties_revision__lt=collection.removal_revision)
+    for properties in stale.values_list('global_properties', flat=True).iterator():
+        names.update(name for name in properties if name not in defined)
+    return strip_task_properties(collection.pk, names, collection.removal_revision)
+
+
+def strip_all_stale_properties() -> int:
+    """
+    Remove the values of undefined properties from the tasks of every collection,
+    e.g. when a background cleanup was interrupted.
+
+    :return: The number of tasks processed.
+    """
+    from db.models.task import TaskCollection
+    updated = 0
+    for collection in TaskCollection.objects.only('pk', 'global_properties', 'removal_revision').iterator():
+        updated += strip_stale_properties(collection)
+    return updated
+
+
+def _strip_in_background(collection_id: int) -> None:
+    from db.models.task import TaskCollection
+    try:
+        # the latest definitions, which also cover removals whose cleanup has not run yet
+        collection = TaskCollection.objects.only('pk', 'global_properties', 'removal_revision').filter(pk=collection_id).first()
+        if collection is not None:
+            strip_stale_properties(collection)
+    except DatabaseError:
+        pass  # readers ignore the stale values, `manage.py strip_stale_properties` picks them up
+    finally:
+        connections.close_all()  # connections opened by this thread only
+
+
+def schedule_property_cleanup(collection_id: int) -> None:
+    """
+    Remove the values of deleted global properties from the tasks of a collection in a background thread,
+    once the current transaction commits.
+    Disabled by TASK_PROPERTY_CLEANUP_IN_PROCESS = False, e.g. when `strip_stale_properties` runs periodically.
+    """
+    if not getattr(settings, 'TASK_PROPERTY_CLEANUP_IN_PROCESS', True):
+        return
+
+    def start():
+        thread = threading.Thread(target=_strip_in_background, args=(collection_id,), daemon=True)
+        thread.start()
+    transaction.on_commit(start)
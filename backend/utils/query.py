@@ -1,9 +1,19 @@
-from typing import Union, List, Dict, Optional, Type
-from django.db.models import QuerySet, Q, Model
+import base64
+import hashlib
+import json
+from datetime import date, datetime, time
+from typing import Union, List, Dict, Optional, Tuple, Type, Any
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet, FieldDoesNotExist, ValidationError as DjangoValidationError
+from django.db import connections
+from django.db.models import F, Field, QuerySet, Q, Model
+from rest_framework.exceptions import ValidationError
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.serializers import Serializer
 from drf_yasg import openapi
 from enum import Enum
+from utils.search import get_search_backend
 
 
 class QuerySteps(Enum):
@@ -11,27 +21,81 @@ class QuerySteps(Enum):
     SEARCH = 'search'
     ORDER_BY = 'order_by'
     PAGINATION = 'pagination'
+    CURSOR = 'cursor'
+
+
+class CountMode(Enum):
+    EXACT = 'exact'        # COUNT(*) on every request
+    ESTIMATE = 'estimate'  # planner estimate on PostgreSQL, otherwise a cached exact count
+    NONE = 'none'          # no count, rely on `has_next`
+
+
+def get_request_params(request) -> dict:
+    """ Parameters of read endpoints, from the query string of GET requests, otherwise from the body """
+    if request.method in ('GET', 'HEAD'):
+        return request.query_params.dict()
+    return request.data
 
 
 class QueryOptions:
     def __init__(self, page: Optional[int] = None, page_size: Optional[int] = None, order_by: Optional[str] = None, 
-                 search: Optional[str] = None, filters: Optional[dict] = {}):
+                 search: Optional[str] = None, filters: Optional[dict] = {}, cursor: Optional[str] = None,
+                 count: Optional[CountMode] = None):
         self.page = page
         self.page_size = page_size
         self.order_by = order_by
         self.search = search
         self.filters = filters
+        self.cursor = cursor
+        self.count = count  # None: exact, except for cursor pages which are not counted
 
     @classmethod
     def build_from_request(cls, request, defaults: dict = None) -> 'QueryOptions':
-        data = {**(defaults or {}), **request.data}
+        data = {**(defaults or {}), **get_request_params(request)}
         return cls(
             page=data.get('page', None),
             page_size=data.get('page_size', None),
             order_by=data.get('order_by', None),
             search=data.get('search', None),
-            filters=data.get('filters', {})
+            filters=data.get('filters', {}),
+            cursor=data.get('cursor', None),
+            count=cls._parse_count_mode(data.get('count', None))
         )
+
+    def restrict(self, filter_lookups: Dict[str, List[str]], ordering_fields: List[str]) -> None:
+        """
+        Restrict the filters and ordering of the client to the given fields, e.g. so that
+        filters cannot traverse relations to other models.
+
+        :param filter_lookups: The lookups allowed on each field, 'exact' for filters by the bare field name,
+            e.g. {'local_id': ['exact', 'in'], 'updated_at': ['gte', 'lt']}.
+        :param ordering_fields: The fields allowed in `order_by`, in either direction.
+        :raises ValidationError: For other filters or ordering.
+        """
+        if not isinstance(self.filters or {}, dict):
+            raise ValidationError({'filters': 'Must be an object.'})
+        for key in self.filters or {}:
+            name, _, lookup = key.partition('__')
+            if (lookup or 'exact') not in filter_lookups.get(name, []):
+                raise ValidationError({'filters': f"Unsupported filter '{key}'."})
+        if self.order_by and (not isinstance(self.order_by, str) or self.order_by.lstrip('-') not in ordering_fields):
+            raise ValidationError({'order_by': f"Must be one of {ordering_fields}, optionally prefixed with '-'."})
+
+    def to_version(self) -> tuple:
+        """ Every option, e.g. as part of an ETag """
+        return (
+            self.page, self.page_size, self.order_by, self.search,
+            json.dumps(self.filters, sort_keys=True, default=str), self.cursor, self.count
+        )
+
+    @staticmethod
+    def _parse_count_mode(value) -> Optional[CountMode]:
+        if value is None:
+            return None
+        try:
+            return CountMode(value)
+        except ValueError:
+            raise ValidationError({'count': f"Must be one of {[mode.value for mode in CountMode]}."})
     
     @staticmethod
     def to_openapi_schema(
@@ -68,6 +132,24 @@ class QueryOptions:
                 description="Number of items per page",
                 default=20
             )
+        if QuerySteps.CURSOR in supported_steps:
+            properties['cursor'] = openapi.Schema(
+                type=openapi.TYPE_STRING,
+                description="Opaque cursor for keyset pagination, '' for the first page, "
+                            "then the 'next_cursor' of the previous page. Overrides 'page'."
+            )
+            properties.setdefault('page_size', openapi.Schema(
+                type=openapi.TYPE_INTEGER,
+                description="Number of items per page",
+                default=20
+            ))
+        if QuerySteps.PAGINATION in supported_steps or QuerySteps.CURSOR in supported_steps:
+            properties['count'] = openapi.Schema(
+                type=openapi.TYPE_STRING,
+                enum=[mode.value for mode in CountMode],
+                description="How to compute the total count: 'exact', 'estimate' or 'none' (null count, use 'has_next'). "
+                            "Defaults to 'exact', or 'none' with a cursor"
+            )
         if extra_schemas:
             properties.update(extra_schemas)
 
@@ -77,10 +159,41 @@ class QueryOptions:
         )
 
 
+def estimate_count(queryset: QuerySet) -> int:
+    """
+    Approximate the number of rows of a queryset without paying a COUNT(*) on every call.
+    Uses the planner's row estimate on PostgreSQL, otherwise an exact count cached
+    for QUERY_COUNT_CACHE_TIMEOUT seconds.
+    """
+    try:
+        sql, params = queryset.query.sql_with_params()
+    except EmptyResultSet:
+        return 0
+
+    connection = connections[queryset.db]
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]['Plan']['Plan Rows'])
+
+    key = 'unica:count:' + hashlib.md5(f"{sql}{params}".encode()).hexdigest()
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, getattr(settings, 'QUERY_COUNT_CACHE_TIMEOUT', 60))
+    return count
+
+
 class QueryResult:
-    def __init__(self, count: int, queryset: QuerySet):
+    def __init__(self, count: Optional[int], queryset: QuerySet, next_cursor: Optional[str] = None,
+                 has_next: bool = False):
         self.count = count
         self.queryset = queryset
+        self.next_cursor = next_cursor
+        self.has_next = has_next
 
     def __iter__(self):
         yield self.count
@@ -90,31 +203,180 @@ class QueryResult:
         serializer = serializer_class(self.queryset, many=True, **kwargs)
         return {
             'count': self.count,
+            'has_next': self.has_next,
+            'next_cursor': self.next_cursor,
             'results': serializer.data
         }
     
 
 class CustomPagination(PageNumberPagination):
+    @staticmethod
+    def _get_positive_int(options: QueryOptions, name: str, default: int) -> int:
+        try:
+            value = int(getattr(options, name) or default)
+        except (ValueError, TypeError):
+            raise ValidationError({name: 'Must be a positive integer.'})
+        if value < 1:
+            raise ValidationError({name: 'Must be a positive integer.'})
+        return value
+
     def paginate_queryset(self, queryset, options):
-        page = options.page or 1
-        page_size = options.page_size or self.page_size
+        """
+        :raises ValidationError: For a page or page size that is not a positive integer.
+        """
+        page = self._get_positive_int(options, 'page', 1)
+        page_size = self._get_positive_int(options, 'page_size', self.page_size)
         self.page = page
 
+        if options.count not in (None, CountMode.EXACT):
+            # Fetch one extra row to tell whether there is a next page, without counting
+            offset = (page - 1) * page_size
+            rows = list(queryset[offset:offset + page_size + 1])
+            count = estimate_count(queryset) if options.count == CountMode.ESTIMATE else None
+            return count, rows[:page_size], len(rows) > page_size
+
         paginator = self.django_paginator_class(queryset, page_size)
         self.page = paginator.page(self.page)
         
-        return paginator.count, list(self.page)
+        return paginator.count, list(self.page), self.page.has_next()
+
+
+class CursorPagination:
+    """
+    Keyset pagination over the ordering of a queryset, with the primary key as tie-breaker.
+    The cursor encodes the ordering values of the last row of the previous page,
+    so every page is fetched in constant time regardless of its depth.
+    Rows with a null ordering value come last, in both directions.
+    """
+    page_size = 20
+    max_page_size = 1000
+
+    @staticmethod
+    def _encode(values: List[Any]) -> str:
+        def default(value):
+            if isinstance(value, (datetime, date, time)):
+                return value.isoformat()  # keep microseconds, unlike DjangoJSONEncoder
+            return str(value)
+        raw = json.dumps(values, default=default, separators=(',', ':'))
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    @staticmethod
+    def _decode(cursor: str, fields: List[Optional[Field]]) -> List[Any]:
+        """
+        Ordering values of a cursor, converted by the model fields (None for annotations).
+
+        :raises ValidationError: If the cursor was not issued for this ordering.
+        """
+        if not isinstance(cursor, str):
+            raise ValidationError({'cursor': 'Invalid cursor.'})
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            if not isinstance(values, list) or len(values) != len(fields):
+                raise ValueError
+            return [
+                field.to_python(value) if field is not None and value is not None else value
+                for field, value in zip(fields, values)
+            ]
+        except (ValueError, TypeError, DjangoValidationError):
+            raise ValidationError({'cursor': 'Invalid cursor.'})
+
+    @staticmethod
+    def _get_ordering(queryset: QuerySet) -> List[Tuple[str, bool]]:
+        ordering = list(queryset.query.order_by or queryset.model._meta.ordering)
+        if not all(isinstance(field, str) for field in ordering):
+            raise ValueError("Cursor pagination only supports ordering by field names.")
+        keys = [(field.lstrip('-'), field.startswith('-')) for field in ordering]
+        if not any(name in ('pk', 'id') for name, _ in keys):
+            keys.append(('pk', keys[-1][1] if keys else False))  # stable tie-breaking
+        return keys
+
+    @staticmethod
+    def _get_field(model: Type[Model], name: str) -> Optional[Field]:
+        """ The model field of an ordering name, possibly across relations, None for annotations """
+        field = None
+        for attr in name.split('__'):
+            if model is None:
+                return None
+            try:
+                field = model._meta.pk if attr == 'pk' else model._meta.get_field(attr)
+            except FieldDoesNotExist:
+                return None
+            model = field.related_model
+        if field is not None and field.is_relation:
+            field = field.target_field  # ordering by a foreign key compares its column
+        return field
+
+    @staticmethod
+    def _get_value(obj: Union[Model, dict], name: str):
+        if isinstance(obj, dict):  # values() rows
+            return obj[name]
+        for attr in name.split('__'):
+            obj = getattr(obj, attr)
+        return obj
+
+    def _get_page_size(self, options: QueryOptions) -> int:
+        try:
+            page_size = int(options.page_size or self.page_size)
+        except (ValueError, TypeError):
+            raise ValidationError({'page_size': 'Must be a positive integer.'})
+        if page_size < 1:
+            raise ValidationError({'page_size': 'Must be a positive integer.'})
+        return min(page_size, self.max_page_size)
+
+    def get_cursor(self, queryset: QuerySet, obj: Model) -> str:
+        """ Cursor of the rows after `obj` in the ordering of `queryset` """
+        return self._encode([self._get_value(obj, name) for name, _ in self._get_ordering(queryset)])
+
+    def paginate_queryset(self, queryset: QuerySet, options: QueryOptions,
+                          values: Optional[List[str]] = None) -> Tuple[List[Union[Model, dict]], Optional[str]]:
+        """
+        :param values: Lookups of `values()` rows to return instead of model instances.
+        :raises ValidationError: For an invalid cursor or page size.
+        """
+        page_size = self._get_page_size(options)
+        keys = self._get_ordering(queryset)
+        fields = [self._get_field(queryset.model, name) for name, _ in keys]
+        nullable = [field is None or field.null for field in fields]
+        queryset = queryset.order_by(*[
+            (F(name).desc(nulls_last=True) if desc else F(name).asc(nulls_last=True)) if is_nullable
+            else (f"-{name}" if desc else name)
+            for (name, desc), is_nullable in zip(keys, nullable)
+        ])
+        if values is not None:
+            # the rows must carry the ordering values for the next cursor
+            queryset = queryset.values(*values, *[name for name, _ in keys if name not in values])
+
+        if options.cursor:
+            values = self._decode(options.cursor, fields)
+            condition = Q()
+            for i, (name, desc) in enumerate(keys):
+                if values[i] is None:
+                    continue  # nulls come last, only the next keys can move past a null
+                after = Q(**{f"{name}__{'lt' if desc else 'gt'}": values[i]})
+                if nullable[i]:
+                    after |= Q(**{f"{name}__isnull": True})
+                # exact None filters are IS NULL
+                condition |= Q(**{keys[j][0]: values[j] for j in range(i)}) & after
+            queryset = queryset.filter(condition)
+
+        rows = list(queryset[:page_size + 1])
+        if len(rows) <= page_size:
+            return rows, None
+        rows = rows[:page_size]
+        return rows, self._encode([self._get_value(rows[-1], name) for name, _ in keys])
     
 
 class QueryExecutor:
     def __init__(self, base_query: Union[QuerySet, Type[Model]], options: QueryOptions, 
-                 supported_steps: Optional[List[QuerySteps]] = None):
+                 supported_steps: Optional[List[QuerySteps]] = None, values: Optional[List[str]] = None):
         """
         :param base_query: 
             Can be a model class or a predefined QuerySet. 
             If a model is passed, a lazy query .objects.all() is used to generate the queryset.
         :param options: QueryOptions object containing parameters for pagination, sorting, searching, etc.
         :param supported_steps: List of supported execution steps.
+        :param values: Lookups of `values()` rows to return instead of model instances,
+            e.g. the `lookups()` of a ValuesSerializer.
         """
         if isinstance(base_query, QuerySet):
             self.query: QuerySet = base_query
@@ -127,19 +389,33 @@ class QueryExecutor:
             QuerySteps.SEARCH, 
             QuerySteps.ORDER_BY, 
             QuerySteps.PAGINATION,
+            QuerySteps.CURSOR,
         ]
+        self.values: Optional[List[str]] = values
 
     def _apply_filters(self):
         if QuerySteps.FILTERS in self.supported_steps and self.options.filters:
-            self.query = self.query.filter(**self.options.filters)
+            if not isinstance(self.options.filters, dict):
+                raise ValidationError({'filters': 'Must be an object.'})
+            try:
+                self.query = self.query.filter(**self.options.filters)
+            except (ValueError, TypeError, DjangoValidationError):
+                raise ValidationError({'filters': 'Invalid filter value.'})
         return self
 
     def _apply_search(self, search_fields: List[str]):
         if QuerySteps.SEARCH in self.supported_steps and self.options.search:
+            backend = get_search_backend()
+            if backend and backend.supports(self.query.model, self.options.search):
+                # Full-text search, ordered by relevance unless an explicit order_by is applied later
+                self.query = backend.search(self.query, self.options.search)
+                return self
             filters = Q()
             for field in search_fields:
                 filters |= Q(**{f"{field}__icontains": self.options.search})
             self.query = self.query.filter(filters)
+            if any('__' in field for field in search_fields):
+                self.query = self.query.distinct()  # lookups across multi-valued relations duplicate rows
         return self
 
     def _apply_order_by(self):
@@ -148,16 +424,30 @@ class QueryExecutor:
         return self
 
     def _apply_pagination(self) -> QueryResult:
+        if QuerySteps.CURSOR in self.supported_steps and self.options.cursor is not None:
+            rows, next_cursor = CursorPagination().paginate_queryset(self.query, self.options, values=self.values)
+            # By default cursor pages are not counted, it would defeat keyset pagination
+            return QueryResult(self._count(CountMode.NONE), rows, next_cursor, has_next=next_cursor is not None)
+        if self.values is not None:
+            self.query = self.query.values(*self.values)
         if QuerySteps.PAGINATION in self.supported_steps and self.options.page and self.options.page_size:
             paginator = CustomPagination()
-            count, paginated_queryset = paginator.paginate_queryset(self.query, self.options)
-            return QueryResult(count, paginated_queryset)
-        return QueryResult(self.query.count(), self.query)
+            count, paginated_queryset, has_next = paginator.paginate_queryset(self.query, self.options)
+            return QueryResult(count, paginated_queryset, has_next=has_next)
+        return QueryResult(self._count(CountMode.EXACT), self.query)
+
+    def _count(self, default: CountMode) -> Optional[int]:
+        mode = self.options.count or default
+        if mode == CountMode.EXACT:
+            return self.query.count()
+        if mode == CountMode.ESTIMATE:
+            return estimate_count(self.query)
+        return None
 
     def execute(self, search_fields: Optional[List[str]] = None) -> QueryResult:
         """
         Executes the query and returns the queryset.
-        :param search_fields: List of fields that support searching
+        :param search_fields: List of fields searched with `icontains` when no full-text backend handles the model
         :return: Returns a QuerySet object that has been paginated, filtered, sorted, and searched
         """
         search_fields = search_fields or []
@@ -0,0 +1,38 @@
+from typing import Type
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import F, Model
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from db.models.organization import Organization, Membership
+from db.models.discussion import Discussion, DiscussionCategory
+from db.models.project import Project
+
+
+def bump_revision(model: Type[Model], pk):
+    """
+    Record a change of the rows related to an object (e.g. the members of an organization),
+    which its `updated_at` does not reflect. Revisions are part of the ETags of its responses.
+    """
+    model.objects.filter(pk=pk).update(revision=F('revision') + 1)
+
+
+@receiver([post_save, post_delete], sender=Membership)
+def _on_membership_change(sender, instance, **kwargs):
+    bump_revision(Organization, instance.organization_id)
+
+
+@receiver([post_save, post_delete], sender=Discussion)
+def _on_discussion_change(sender, instance, **kwargs):
+    bump_revision(Organization, instance.organization_id)
+
+
+@receiver([post_save, post_delete], sender=Project)
+def _on_project_change(sender, instance, created=True, **kwargs):
+    # Only the number of projects is exposed by the organization
+    if created and instance.owner_type_id == ContentType.objects.get_for_model(Organization).id:
+        bump_revision(Organization, instance.owner_id)
+
+
+@receiver([post_save, post_delete], sender=DiscussionCategory)
+def _on_category_change(sender, instance, **kwargs):
+    bump_revision(Discussion, instance.discussion_id)
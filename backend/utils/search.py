@@ -0,0 +1,238 @@
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Type
+from django.conf import settings
+from django.db import connections, router, OperationalError
+from django.db.models import FloatField, Model, Q, QuerySet, Value
+from django.db.models.functions import Coalesce
+from django.db.models.expressions import RawSQL
+from django.db.models.signals import post_save, post_delete
+from django.utils.module_loading import import_string
+from db.models.discussion import DiscussionTopic, DiscussionComment
+from db.models.task import Task
+
+
+@dataclass
+class SearchIndex:
+    """
+    A searchable model. Documents are indexed for their `target`, i.e. a hit on
+    a comment is a hit on the topic it belongs to.
+    """
+    model: Type[Model]
+    fields: List[str]
+    target: Optional[str] = None  # foreign key to the target model, None when the model is the target
+    active: Dict[str, object] = field(default_factory=lambda: {'deleted': False})  # filters of indexed rows
+
+    @property
+    def target_model(self) -> Type[Model]:
+        return self.model._meta.get_field(self.target).related_model if self.target else self.model
+
+    def target_id(self, instance: Model):
+        return getattr(instance, self.model._meta.get_field(self.target).attname) if self.target else instance.pk
+
+    def is_active(self, instance: Model) -> bool:
+        return all(getattr(instance, name) == value for name, value in self.active.items())
+
+    def content(self, instance: Model) -> str:
+        return '\n'.join(str(getattr(instance, name) or '') for name in self.fields)
+
+
+SEARCH_INDEXES = [
+    SearchIndex(DiscussionTopic, ['title']),
+    SearchIndex(DiscussionComment, ['content'], target='topic'),
+    SearchIndex(Task, ['title', 'description']),
+]
+
+
+def _get_index(model: Type[Model]) -> Optional[SearchIndex]:
+    for index in SEARCH_INDEXES:
+        if index.model is model:
+            return index
+    return None
+
+
+class SearchBackend:
+    """
+    Interface of full-text search backends.
+    Backends that compute matches on the fly can leave the indexing methods as no-ops.
+    """
+    def supports(self, model: Type[Model], term: str) -> bool:
+        return any(index.target_model is model for index in SEARCH_INDEXES)
+
+    def search(self, queryset: QuerySet, term: str) -> QuerySet:
+        """
+        Filter a queryset of a target model to the rows matching `term`,
+        annotated with `search_rank` (lower is better) and ordered by it.
+        """
+        raise NotImplementedError
+
+    def index(self, index: SearchIndex, instances: Iterable[Model]):
+        pass
+
+    def remove(self, index: SearchIndex, pks: Iterable):
+        pass
+
+    def rebuild(self):
+        pass
+
+
+class SQLiteFTSBackend(SearchBackend):
+    """
+    FTS5 virtual table with the trigram tokenizer, which keeps the substring semantics
+    of `icontains` (and works for CJK text) but answers from the index.
+    Terms shorter than 3 characters cannot use trigrams and fall back to `icontains`.
+    The table is created by the `api` migrations.
+    """
+    table = 'search_index'
+
+    def __init__(self, using: str = 'default'):
+        self.using = using
+
+    def is_available(self) -> bool:
+        try:
+            with self._cursor() as cursor:
+                cursor.execute(f"SELECT 1 FROM {self.table} LIMIT 0")
+            return True
+        except OperationalError:  # SQLite without FTS5 or trigrams, the migration skipped the table
+            return False
+
+    def _cursor(self):
+        return connections[self.using].cursor()
+
+    @staticmethod
+    def _rowid(index: SearchIndex, pk) -> int:
+        # Pack the document type in the low bits, so a document is replaced by rowid
+        return int(pk) * 8 + SEARCH_INDEXES.index(index)
+
+    def supports(self, model, term):
+        return len(term) >= 3 and super().supports(model, term)
+
+    def search(self, queryset, term):
+        phrase = '"' + term.replace('"', '""') + '"'
+        model = queryset.model
+        # Uncorrelated, so the match runs once and the queryset's own filters scope it
+        matches = RawSQL(
+            f"SELECT target_id FROM {self.table} WHERE {self.table} MATCH %s AND target_type = %s",
+            (phrase, model._meta.label_lower)
+        )
+        queryset = queryset.filter(pk__in=matches)
+
+        own = _get_index(model)
+        if own is None:
+            return queryset.annotate(search_rank=Value(0)).order_by('search_rank', *queryset.query.order_by)
+        # Ranked by the row's own document (looked up by rowid) like PostgresBackend, rows only
+        # matched through related documents (e.g. comments) come last: bm25 ranks are negative
+        quote_name = connections[self.using].ops.quote_name
+        pk_column = f"{quote_name(model._meta.db_table)}.{quote_name(model._meta.pk.column)}"
+        rank = RawSQL(
+            f"SELECT rank FROM {self.table} WHERE {self.table} MATCH %s AND rowid = {pk_column} * 8 + %s",
+            (phrase, SEARCH_INDEXES.index(own)), output_field=FloatField()
+        )
+        return queryset.annotate(search_rank=Coalesce(rank, Value(0.0))).order_by(
+            'search_rank', *queryset.query.order_by
+        )
+
+    def index(self, index, instances):
+        rows, stale = [], []
+        for instance in instances:
+            stale.append([self._rowid(index, instance.pk)])
+            if index.is_active(instance):
+                rows.append([
+                    self._rowid(index, instance.pk), index.content(instance),
+                    index.target_model._meta.label_lower, index.target_id(instance)
+                ])
+        with self._cursor() as cursor:
+            cursor.executemany(f"DELETE FROM {self.table} WHERE rowid = %s", stale)
+            cursor.executemany(
+                f"INSERT INTO {self.table} (rowid, content, target_type, target_id) VALUES (%s, %s, %s, %s)", rows
+            )
+
+    def remove(self, index, pks):
+        with self._cursor() as cursor:
+            cursor.executemany(f"DELETE FROM {self.table} WHERE rowid = %s", [[self._rowid(index, pk)] for pk in pks])
+
+    def rebuild(self):
+        with self._cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table}")
+        for index in SEARCH_INDEXES:
+            queryset = index.model.objects.filter(**index.active).order_by('pk')
+            for start in range(0, queryset.count(), 1000):
+                self.index(index, queryset[start:start + 1000])
+
+
+class PostgresBackend(SearchBackend):
+    """
+    Matches `tsvector`s computed on the fly, ranked with `ts_rank`.
+    A GIN expression index on the same vectors makes it index-backed.
+    """
+    config = 'simple'
+
+    def search(self, queryset, term):
+        from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+
+        query = SearchQuery(term, search_type='phrase', config=self.config)
+        condition = Q()
+        for index in SEARCH_INDEXES:
+            if index.target_model is not queryset.model:
+                continue
+            matches = index.model.objects.filter(**index.active).annotate(
+                search_vector=SearchVector(*index.fields, config=self.config)
+            ).filter(search_vector=query).values(index.target or 'pk')
+            condition |= Q(pk__in=matches)
+
+        own = _get_index(queryset.model)
+        # ts_rank is higher for better matches, negate it to keep "lower is better"
+        rank = -SearchRank(SearchVector(*own.fields, config=self.config), query) if own else Value(0)
+        return queryset.filter(condition).annotate(search_rank=rank).order_by('search_rank', *queryset.query.order_by)
+
+
+_backend: Optional[SearchBackend] = None
+_backend_resolved = False
+
+
+def get_search_backend() -> Optional[SearchBackend]:
+    """
+    Return the configured SEARCH_BACKEND (a dotted path), or pick one for the database vendor.
+    None means no full-text backend, and searches use `icontains` filters.
+    """
+    global _backend, _backend_resolved
+    if not _backend_resolved:
+        path = getattr(settings, 'SEARCH_BACKEND', None)
+        using = router.db_for_write(Task)
+        vendor = connections[using].vendor
+        if path:
+            _backend = import_string(path)()
+        elif vendor == 'sqlite':
+            backend = SQLiteFTSBackend(using)
+            _backend = backend if backend.is_available() else None
+        elif vendor == 'postgresql':
+            _backend = PostgresBackend()
+        _backend_resolved = True
+    return _backend
+
+
+def index_instances(model: Type[Model], instances: Iterable[Model]):
+    """ Index instances saved without signals, e.g. by bulk_create() """
+    backend, index = get_search_backend(), _get_index(model)
+    if backend and index:
+        backend.index(index, instances)
+
+
+def remove_instances(model: Type[Model], pks: Iterable):
+    """ Remove instances deleted or hidden without signals, e.g. by QuerySet.update() """
+    backend, index = get_search_backend(), _get_index(model)
+    if backend and index:
+        backend.remove(index, pks)
+
+
+def _on_save(sender, instance, raw=False, **kwargs):
+    if not raw:
+        index_instances(sender, [instance])
+
+
+def _on_delete(sender, instance, **kwargs):
+    remove_instances(sender, [instance.pk])
+
+
+for _index in SEARCH_INDEXES:
+    post_save.connect(_on_save, sender=_index.model, dispatch_uid=f'search_index_{_index.model.__name__}')
+    post_delete.connect(_on_delete, sender=_index.model, dispatch_uid=f'search_remove_{_index.model.__name__}')